@@ -0,0 +1,225 @@
+"""
+Index of Core Projects and SPECs
+================================
+
+Collect the front matter of ``core-projects/*.md`` and ``spec-*/index.md``
+into one JSON index, so that the SPEC 0 generator and other tools can look up
+core projects and endorsements without parsing every page::
+
+    python .tools/spec_index.py pypi
+    python .tools/spec_index.py endorsing 0
+
+The index is updated incrementally: a file is only parsed again if its
+modification time or size changed and its contents hash differs.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+INDEX = Path(__file__).parent / "spec_index.json"
+
+
+def _scalar(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    if value.isdigit():
+        return int(value)
+    return value or None
+
+
+def parse_front_matter(text):
+    """Parse the YAML front matter of a page.
+
+    Only the subset used by the pages of this repository is supported:
+    ``key: value`` lines with string, integer and boolean values, and lists of
+    ``  - item`` lines. A key without value or items is None.
+
+    Returns
+    -------
+    dict
+        Empty if the page has no front matter.
+
+    """
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != "---":
+        return {}
+
+    metadata = {}
+    key = None
+    for line in lines[1:]:
+        if line.strip() == "---":
+            break
+        if line.lstrip().startswith("- ") and key is not None:
+            if metadata[key] is None:
+                metadata[key] = []
+            metadata[key].append(_scalar(line.lstrip()[2:].strip()))
+        elif ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip()
+            metadata[key] = _scalar(value.strip())
+    return metadata
+
+
+def _pages(root):
+    root = Path(root)
+    for path in sorted(root.glob("core-projects/*.md")):
+        if path.name != "_index.md":
+            yield "project", path.stem, path
+    for path in sorted(root.glob("spec-*/index.md")):
+        yield "spec", path.parent.name, path
+
+
+class SpecIndex:
+    """Front matter of the core project and SPEC pages.
+
+    Parameters
+    ----------
+    root : str or Path
+        Root of the repository.
+    path : str or Path, optional
+        JSON file of the index, read if it exists. Use `update` to bring it up
+        to date and save it.
+
+    Attributes
+    ----------
+    pages : dict
+        For each page, by path relative to `root`: its ``kind`` (``"project"``
+        or ``"spec"``), ``name`` (file stem or SPEC directory), ``mtime``,
+        ``size``, ``sha256`` and ``metadata``.
+
+    """
+
+    def __init__(self, root=ROOT, path=None):
+        self.root = Path(root)
+        self.path = path
+        self.pages = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as fh:
+                self.pages = json.load(fh)
+
+    def update(self):
+        """Parse new and changed pages, drop removed ones and save the index.
+
+        Returns
+        -------
+        int
+            Number of pages parsed.
+
+        """
+        pages = {}
+        n_parsed = 0
+        for kind, name, path in _pages(self.root):
+            key = path.relative_to(self.root).as_posix()
+            stat = path.stat()
+            page = self.pages.get(key)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if page and (page["mtime"], page["size"]) == signature:
+                pages[key] = page
+                continue
+
+            data = path.read_bytes()
+            sha256 = hashlib.sha256(data).hexdigest()
+            if page is None or page["sha256"] != sha256:
+                metadata = parse_front_matter(data.decode())
+                n_parsed += 1
+            else:
+                # Touched, but not changed
+                metadata = page["metadata"]
+            pages[key] = {
+                "kind": kind,
+                "name": name,
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": sha256,
+                "metadata": metadata,
+            }
+
+        self.pages = pages
+        if self.path is not None:
+            with open(self.path, "w") as fh:
+                json.dump(pages, fh, separators=(",", ":"))
+        return n_parsed
+
+    def _metadata(self, kind):
+        return {
+            page["name"]: page["metadata"]
+            for page in self.pages.values()
+            if page["kind"] == kind
+        }
+
+    def projects(self):
+        """Metadata of the core projects, by page name, e.g. ``"mne-python"``."""
+        return self._metadata("project")
+
+    def specs(self):
+        """Metadata of the SPECs, by number."""
+        return {
+            metadata["number"]: metadata
+            for metadata in self._metadata("spec").values()
+            if isinstance(metadata.get("number"), int)
+        }
+
+    def pypi_names(self):
+        """PyPI names of the core projects, e.g. ``"mne"`` for MNE-Python."""
+        return [
+            metadata["pypi"].rstrip("/").rsplit("/", 1)[-1]
+            for metadata in self.projects().values()
+            if metadata.get("pypi")
+        ]
+
+    def endorsing(self, number):
+        """Core projects endorsing SPEC `number`."""
+        return list(self.specs().get(number, {}).get("endorsed-by") or [])
+
+    def endorsed_by(self, project):
+        """Numbers of the SPECs endorsed by `project`, a core project page name."""
+        return [
+            number
+            for number, metadata in sorted(self.specs().items())
+            if project in (metadata.get("endorsed-by") or [])
+        ]
+
+
+def load_index(root=ROOT, path=INDEX):
+    """Return the index of `root`, updated from the changed pages."""
+    index = SpecIndex(root, path)
+    index.update()
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--root", default=ROOT, help="root of the repository")
+    parser.add_argument("--index", default=INDEX, help="JSON file of the index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("projects", help="core projects")
+    commands.add_parser("pypi", help="PyPI names of core projects")
+    commands.add_parser("specs", help="SPEC numbers and titles")
+    endorsing = commands.add_parser("endorsing", help="projects endorsing a SPEC")
+    endorsing.add_argument("number", type=int)
+    endorsed_by = commands.add_parser("endorsed-by", help="SPECs endorsed by a project")
+    endorsed_by.add_argument("project")
+    args = parser.parse_args(argv)
+
+    index = load_index(args.root, args.index)
+    if args.command == "projects":
+        lines = list(index.projects())
+    elif args.command == "pypi":
+        lines = index.pypi_names()
+    elif args.command == "specs":
+        lines = [f"{n}: {m.get('title')}" for n, m in sorted(index.specs().items())]
+    elif args.command == "endorsing":
+        lines = index.endorsing(args.number)
+    else:
+        lines = index.endorsed_by(args.project)
+    print("\n".join(map(str, lines)))
+
+
+if __name__ == "__main__":
+    main()
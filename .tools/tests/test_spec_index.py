@@ -0,0 +1,97 @@
+import os
+
+from spec_index import ROOT, SpecIndex, main, parse_front_matter
+
+
+PROJECT = """---
+title: "NumPy"
+pypi: https://pypi.org/project/numpy
+contact: melissawm
+---
+
+Text: not front matter
+"""
+
+SPEC = """---
+title: "SPEC 7 — Seeding"
+number: 7
+date: 2023-04-19
+author:
+  - "Stéfan van der Walt <stefanv@berkeley.edu>"
+discussion:
+is-draft: false
+endorsed-by:
+  - numpy
+---
+"""
+
+
+def make_repo(root):
+    (root / "core-projects").mkdir()
+    (root / "core-projects" / "_index.md").write_text("---\ntitle: Core\n---\n")
+    (root / "core-projects" / "numpy.md").write_text(PROJECT)
+    (root / "core-projects" / "mne-python.md").write_text(
+        PROJECT.replace("numpy", "mne")
+    )
+    (root / "spec-0007").mkdir()
+    (root / "spec-0007" / "index.md").write_text(SPEC)
+
+
+def test_parse_front_matter():
+    assert parse_front_matter(SPEC) == {
+        "title": "SPEC 7 — Seeding",
+        "number": 7,
+        "date": "2023-04-19",
+        "author": ["Stéfan van der Walt <stefanv@berkeley.edu>"],
+        "discussion": None,
+        "is-draft": False,
+        "endorsed-by": ["numpy"],
+    }
+    assert parse_front_matter(PROJECT)["pypi"] == "https://pypi.org/project/numpy"
+    assert "Text" not in parse_front_matter(PROJECT)
+    assert parse_front_matter("# No front matter\n") == {}
+
+
+def test_lookups(tmp_path):
+    make_repo(tmp_path)
+    index = SpecIndex(tmp_path)
+    assert index.update() == 3
+
+    assert list(index.projects()) == ["mne-python", "numpy"]
+    assert index.pypi_names() == ["mne", "numpy"]
+    assert list(index.specs()) == [7]
+    assert index.endorsing(7) == ["numpy"]
+    assert index.endorsing(0) == []
+    assert index.endorsed_by("numpy") == [7]
+    assert index.endorsed_by("mne-python") == []
+
+
+def test_incremental_update(tmp_path):
+    make_repo(tmp_path)
+    path = tmp_path / "index.json"
+    assert SpecIndex(tmp_path, path).update() == 3
+    assert SpecIndex(tmp_path, path).update() == 0
+
+    # Touched files are hashed, but only changed ones are parsed
+    spec = tmp_path / "spec-0007" / "index.md"
+    os.utime(spec, ns=(0, 0))
+    assert SpecIndex(tmp_path, path).update() == 0
+    spec.write_text(SPEC.replace("  - numpy\n", "  - numpy\n  - mne-python\n"))
+    (tmp_path / "core-projects" / "numpy.md").unlink()
+
+    index = SpecIndex(tmp_path, path)
+    assert index.update() == 1
+    assert index.endorsing(7) == ["numpy", "mne-python"]
+    assert index.pypi_names() == ["mne"]
+    assert index.pages == SpecIndex(tmp_path, path).pages
+
+
+def test_repository_index(tmp_path, capsys):
+    index = SpecIndex(ROOT)
+    index.update()
+    assert {"numpy", "scipy", "mne"} <= set(index.pypi_names())
+    assert "numpy" in index.endorsing(0)
+    assert 0 in index.endorsed_by("numpy")
+
+    main(["--index", str(tmp_path / "index.json"), "endorsing", "0"])
+    assert "numpy\n" in capsys.readouterr().out
@@ -1,12 +1,35 @@
-import requests
-import collections
+"""
+SPEC 0 Support Windows
+======================
+
+Compute the support windows of Python and of the core packages, and render
+the Mermaid chart (``chart.md``) and drop schedule (``schedule.md``) included
+in SPEC 0::
+
+    python SPEC0_versions.py [--as-of YYYY-MM-DD]
+
+The work is split into stages that can be used on their own: `fetch`
+downloads release dates from PyPI, `compute_support_window` selects the
+releases still supported at a given date, and `render` formats them. Importing
+this module has no side effects; pandas and requests are only imported by the
+stages that need them, and ``--engine stdlib`` runs without pandas.
+"""
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-
-import pandas as pd
-from packaging.version import Version, InvalidVersion
+from itertools import groupby
+from operator import attrgetter, itemgetter
 
 
 py_releases = {
+    "3.4": "Mar 16, 2014",
+    "3.5": "Sep 13, 2015",
+    "3.6": "Dec 23, 2016",
+    "3.7": "Jun 27, 2018",
     "3.8": "Oct 14, 2019",
     "3.9": "Oct 5, 2020",
     "3.10": "Oct 4, 2021",
@@ -31,130 +54,196 @@ core_packages = [
 plus36 = timedelta(days=int(365 * 3))
 plus24 = timedelta(days=int(365 * 2))
 
+# Number of packages queried concurrently
+max_workers = 8
+
+# pypi.org responses and parsed release dates are kept here between runs
+cache_dir = os.path.expanduser("~/.cache/spec0")
+
+
 # Release data
 
-# put cutoff 3 quarters ago – we do not use "just" -9 month,
-# to avoid the content of the quarter to change depending on when we generate this
-# file during the current quarter.
 
-current_date = pd.Timestamp.now()
-current_quarter_start = pd.Timestamp(
-    current_date.year, (current_date.quarter - 1) * 3 + 1, 1
-)
-cutoff = current_quarter_start - pd.DateOffset(months=9)
+def cutoff_date(as_of):
+    # put cutoff 3 quarters ago – we do not use "just" -9 month,
+    # to avoid the content of the quarter to change depending on when we generate
+    # this file during the current quarter.
+    months = as_of.year * 12 + (as_of.month - 1) // 3 * 3 - 9
+    return datetime(months // 12, months % 12 + 1, 1)
 
 
-def get_release_dates(package, support_time=plus24):
-    releases = {}
+def support_time(package):
+    return plus36 if package == "python" else plus24
 
-    print(f"Querying pypi.org for {package} versions...", end="", flush=True)
-    response = requests.get(
-        f"https://pypi.org/simple/{package}",
-        headers={"Accept": "application/vnd.pypi.simple.v1+json"},
-    ).json()
-    print("OK")
 
-    file_date = collections.defaultdict(list)
-    for f in response["files"]:
-        ver = f["filename"].split("-")[1]
-        try:
-            version = Version(ver)
-        except InvalidVersion as e:
-            print(f"Error: '{ver}' is an invalid version for '{package}'. Reason: {e}")
-            continue
+def python_release_dates():
+    return {
+        version: datetime.strptime(release_date, "%b %d, %Y")
+        for version, release_date in py_releases.items()
+    }
 
-        if version.is_prerelease or version.micro != 0:
-            continue
 
-        release_date = None
-        for format in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"]:
-            try:
-                release_date = datetime.strptime(f["upload-time"], format)
-            except ValueError as e:
-                print(f"Error parsing invalid date: {e}")
+def get_release_dates(
+    package,
+    backend,
+    release_db=None,
+    batched_parsing=True,
+    requires_python=None,
+    stats=None,
+):
+    from release_dates import _print, parse_release_dates, parse_release_dates_batched
 
-        if not release_date:
-            continue
+    parse = parse_release_dates_batched if batched_parsing else parse_release_dates
 
-        file_date[version].append(release_date)
+    if requires_python is None:
+        files = backend.iter_uploads(package)
+    else:
+        from python_compat import record_requires_python
 
-    release_date = {v: min(file_date[v]) for v in file_date}
+        fields = ("filename", "upload-time", "requires-python")
+        files = record_requires_python(
+            backend.iter_uploads(package, fields), requires_python
+        )
+    if release_db is None:
+        release_date = parse(package, files, stats)
+    else:
+        files = release_db.new_files(package, files)
+        release_db.merge(package, parse(package, files, stats))
+        release_date = release_db.release_dates(package)
+    _print(f"Querying {backend} for {package} versions...OK")
+
+    return dict(sorted(release_date.items()))
+
+
+def fetch(
+    packages=core_packages,
+    backend=None,
+    release_db=None,
+    max_workers=max_workers,
+    batched_parsing=True,
+    requires_python=None,
+    profile=None,
+):
+    """Download the release dates of packages from PyPI.
+
+    Parameters
+    ----------
+    packages : list of str
+        Package names.
+    backend : simple_index.Backend, optional
+        Source of the project listings. Defaults to querying pypi.org.
+    release_db : release_db.ReleaseDB, optional
+        Store of the release dates parsed in earlier runs, for the index or
+        mirror of `backend`.
+    max_workers : int
+        Number of packages queried concurrently.
+    batched_parsing : bool
+        Parse the listings with pandas, which is faster for large listings.
+        Otherwise, files are parsed one by one without importing pandas.
+    requires_python : dict, optional
+        If given, updated with the ``requires-python`` metadata of each
+        package, as ``{package: {Version: specifier}}``; see python_compat.py.
+    profile : profiling.Profile, optional
+        If given, records a span per package, with the size of its listing,
+        whether downloaded or cached, the time spent waiting for it and the
+        number of files parsed.
+
+    Returns
+    -------
+    dict
+        Maps each package to ``{Version: release datetime}``, sorted by version.
+        Packages that the index or mirror does not have are reported and left
+        out, e.g. private packages listed in a lockfile.
+
+    """
+    from release_dates import _print
+    from simple_index import HTTPBackend, ProjectNotFound, fetch_all
+
+    if backend is None:
+        backend = HTTPBackend(pool_size=max_workers)
+
+    def get(package):
+        specifiers = None
+        if requires_python is not None:
+            specifiers = requires_python.setdefault(package, {})
+        try:
+            if profile is None:
+                return get_release_dates(
+                    package, backend, release_db, batched_parsing, specifiers
+                )
+            with profile.span(package, "fetch") as stats:
+                return get_release_dates(
+                    package,
+                    profile.instrument(backend, stats),
+                    release_db,
+                    batched_parsing,
+                    specifiers,
+                    stats,
+                )
+        except ProjectNotFound as e:
+            _print(f"Skipping {package}: {e}")
+            return None
+
+    release_dates = fetch_all(packages, get, max_workers)
+    return {
+        package: dates for package, dates in release_dates.items() if dates is not None
+    }
 
-    for ver, release_date in sorted(release_date.items()):
-        drop_date = release_date + support_time
-        if drop_date >= cutoff:
-            releases[ver] = {
-                "release_date": release_date,
-                "drop_date": drop_date,
-            }
 
-    return releases
+def compute_support_window(release_dates, as_of=None):
+    """Select the releases that are still supported, or were recently dropped.
 
+    Python releases are supported for 36 months, other packages for 24 months.
 
-package_releases = {
-    "python": {
-        version: {
-            "release_date": datetime.strptime(release_date, "%b %d, %Y"),
-            "drop_date": datetime.strptime(release_date, "%b %d, %Y") + plus36,
-        }
-        for version, release_date in py_releases.items()
-    }
-}
+    Parameters
+    ----------
+    release_dates : dict
+        Maps each package, including ``"python"``, to ``{version: release date}``.
+    as_of : datetime, optional
+        Date at which the schedule is computed. Defaults to now.
 
-package_releases |= {package: get_release_dates(package) for package in core_packages}
+    Returns
+    -------
+    dict
+        Maps each package to ``{version: {"release_date": ..., "drop_date": ...}}``
+        for the releases made by `as_of` whose drop date is after the cutoff,
+        three quarters before `as_of`.
 
-# filter all items whose drop_date are in the past
-package_releases = {
-    package: {
-        version: dates
-        for version, dates in releases.items()
-        if dates["drop_date"] > cutoff
-    }
-    for package, releases in package_releases.items()
-}
+    """
+    as_of = as_of or datetime.now()
+    cutoff = cutoff_date(as_of)
+
+    package_releases = {}
+    for package, dates in release_dates.items():
+        window = support_time(package)
+        package_releases[package] = {
+            version: {
+                "release_date": release_date,
+                "drop_date": release_date + window,
+            }
+            for version, release_date in dates.items()
+            if release_date <= as_of and release_date + window > cutoff
+        }
+    return package_releases
 
 
 # Save Gantt chart
 
-print("Saving Mermaid chart to chart.md")
-with open("chart.md", "w") as fh:
-    fh.write(
-        """gantt
+
+def render_chart(package_releases):
+    chart = """gantt
 dateFormat YYYY-MM-DD
 axisFormat %m / %Y
 title Support Window"""
-    )
 
     for name, releases in package_releases.items():
-        fh.write(f"\n\nsection {name}")
+        chart += f"\n\nsection {name}"
         for version, dates in releases.items():
-            fh.write(
-                f"\n{version} : {dates['release_date'].strftime('%Y-%m-%d')},{dates['drop_date'].strftime('%Y-%m-%d')}"
-            )
-    fh.write("\n")
+            chart += f"\n{version} : {dates['release_date'].strftime('%Y-%m-%d')},{dates['drop_date'].strftime('%Y-%m-%d')}"
+    return chart + "\n"
 
-# Print drop schedule
 
-data = []
-for k, versions in package_releases.items():
-    for v, dates in versions.items():
-        data.append(
-            (
-                k,
-                v,
-                pd.to_datetime(dates["release_date"]),
-                pd.to_datetime(dates["drop_date"]),
-            )
-        )
-
-df = pd.DataFrame(data, columns=["package", "version", "release", "drop"])
-
-df["quarter"] = df["drop"].dt.to_period("Q")
-
-dq = df.set_index(["quarter", "package"]).sort_index()
-
-
-print("Saving drop schedule to schedule.md")
+# Print drop schedule
 
 
 def pad_table(table):
@@ -176,41 +265,357 @@ def pad_table(table):
     return padded_table
 
 
-def make_table(sub):
+def make_table(rows):
     table = []
     table.append("|    |    |    |")
     table.append("|----|----|----|")
-    for package in sorted(set(sub.index.get_level_values(0))):
-        vers = sub.loc[[package]]["version"]
-        minv, maxv = min(vers), max(vers)
-        rels = sub.loc[[package]]["release"]
-        rel_min, rel_max = min(rels), max(rels)
+    for row in rows:
+        minv, maxv = row.min_version, row.max_version
+        rel_min, rel_max = row.first_release, row.last_release
         version_range = str(minv) if minv == maxv else f"{minv} to {maxv}"
         rel_range = (
             str(rel_min.strftime("%b %Y"))
             if rel_min == rel_max
             else f"{rel_min.strftime('%b %Y')} and {rel_max.strftime('%b %Y')}"
         )
-        table.append(f"|{package:<15}|{version_range:<19}|released {rel_range}|")
+        table.append(f"|{row.package:<15}|{version_range:<19}|released {rel_range}|")
 
     return pad_table(table)
 
 
-def make_quarter(quarter, dq):
+def make_quarter(quarter, rows):
     table = ["#### " + str(quarter).replace("Q", " - Quarter ") + ":\n"]
     table.append("###### Recommend drop support for:\n")
-    sub = dq.loc[quarter]
-    table.extend(make_table(sub))
+    table.extend(make_table(rows))
     return "\n".join(table)
 
 
-with open("schedule.md", "w") as fh:
+def render_schedule(package_releases):
+    import pandas as pd
+
+    data = [
+        (k, v, dates["release_date"], dates["drop_date"])
+        for k, versions in package_releases.items()
+        for v, dates in versions.items()
+    ]
+    # Sorted by package and version, so that the first and last version of each
+    # group below are its minimum and maximum
+    data.sort(key=itemgetter(0, 1))
+
+    df = pd.DataFrame(data, columns=["package", "version", "release", "drop"])
+    df["release"] = pd.to_datetime(df["release"])
+    df["drop"] = pd.to_datetime(df["drop"])
+
+    df["quarter"] = df["drop"].dt.to_period("Q")
+
+    # One row per quarter and package, sorted by both
+    summary = (
+        df.groupby(["quarter", "package"])
+        .agg(
+            min_version=("version", "first"),
+            max_version=("version", "last"),
+            first_release=("release", "min"),
+            last_release=("release", "max"),
+        )
+        .reset_index()
+    )
+
     # we collect package 6 month in the past, and drop the first quarter
     # as we might have filtered some of the packages out depending on
     # when we ran the script.
+    quarters = groupby(summary.itertuples(index=False), key=attrgetter("quarter"))
+    next(quarters, None)
+    tb = [make_quarter(quarter, rows) for quarter, rows in quarters]
+
+    return "\n\n".join(tb) + "\n"
+
+
+ScheduleRow = namedtuple(
+    "ScheduleRow", "package min_version max_version first_release last_release"
+)
+
+
+def render_schedule_stdlib(package_releases):
+    # Same as render_schedule, without pandas: releases are sorted by drop
+    # quarter, package and version, and grouped in one pass
+    rows = sorted(
+        (
+            (dates["drop_date"].year, (dates["drop_date"].month - 1) // 3 + 1),
+            package,
+            version,
+            dates["release_date"],
+        )
+        for package, versions in package_releases.items()
+        for version, dates in versions.items()
+    )
+
+    quarters = groupby(rows, key=itemgetter(0))
+    next(quarters, None)
     tb = []
-    for quarter in list(sorted(set(dq.index.get_level_values(0))))[1:]:
-        tb.append(make_quarter(quarter, dq))
+    for (year, quarter), quarter_rows in quarters:
+        summary = []
+        for package, package_rows in groupby(quarter_rows, key=itemgetter(1)):
+            _, _, versions, releases = zip(*package_rows)
+            summary.append(
+                ScheduleRow(
+                    package, versions[0], versions[-1], min(releases), max(releases)
+                )
+            )
+        tb.append(make_quarter(f"{year}Q{quarter}", summary))
+
+    return "\n\n".join(tb) + "\n"
+
+
+engines = {"pandas": render_schedule, "stdlib": render_schedule_stdlib}
+
+
+def render(package_releases, engine="pandas"):
+    """Render the support windows as Markdown.
+
+    Parameters
+    ----------
+    package_releases : dict
+        Output of `compute_support_window`.
+    engine : {"pandas", "stdlib"}
+        Library used to group releases by drop quarter. Both give the same
+        output; "stdlib" avoids importing pandas, which takes longer than
+        rendering a small schedule.
+
+    Returns
+    -------
+    dict
+        Maps ``"chart.md"`` to the Mermaid Gantt chart and ``"schedule.md"`` to
+        the quarterly drop schedule.
+
+    """
+    return {
+        "chart.md": render_chart(package_releases),
+        "schedule.md": engines[engine](package_releases),
+    }
+
+
+def optional_span(profile, name, **args):
+    if profile is None:
+        return nullcontext()
+    return profile.span(name, **args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--as-of",
+        type=datetime.fromisoformat,
+        help="compute the schedule at this date (YYYY-MM-DD) instead of today",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--index-url", help="base URL of the simple index to query instead of PyPI"
+    )
+    source.add_argument(
+        "--mirror", help="directory of PEP 691 JSON listings to read instead of PyPI"
+    )
+    parser.add_argument(
+        "--packages-from",
+        nargs="+",
+        metavar="PATH",
+        help="evaluate the packages listed in these pyproject.toml, lock or "
+        "requirements files instead of the core packages; see dependencies.py",
+    )
+    parser.add_argument(
+        "--core-projects",
+        action="store_true",
+        help="evaluate all core projects listed in core-projects/, from the "
+        "index of .tools/spec_index.py, instead of the core packages",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=max_workers,
+        help="number of packages queried concurrently",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=cache_dir,
+        help="directory of the pypi.org response cache and release database",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="always download and parse everything"
+    )
+    parser.add_argument(
+        "--offline", action="store_true", help="only use cached pypi.org responses"
+    )
+    parser.add_argument(
+        "--output-dir", default=".", help="where to write chart.md and schedule.md"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=list(engines),
+        default="pandas",
+        help="library used to parse listings and render the schedule; "
+        "stdlib starts faster",
+    )
+    parser.add_argument(
+        "--backtest",
+        metavar="START",
+        type=datetime.fromisoformat,
+        help="also write backtest.csv, with the drop schedules at the start of "
+        "each quarter from START to the --as-of date",
+    )
+    sweep = parser.add_argument_group(
+        "scenario sweep",
+        "Write scenarios.csv, comparing the drop quarter of each release under "
+        "all combinations of the given support windows and cutoffs.",
+    )
+    sweep.add_argument("--package-months", type=int, nargs="+", metavar="N")
+    sweep.add_argument("--python-months", type=int, nargs="+", metavar="N")
+    sweep.add_argument("--cutoff-quarters", type=int, nargs="+", metavar="N")
+    parser.add_argument(
+        "--ci-matrix",
+        metavar="PATH",
+        help="also write the Python versions supported by each supported "
+        "release, from their requires-python metadata, as a CI matrix in JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="also write the duration of each stage, and the download time, "
+        "size and parse errors of each package; see profiling.py",
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=["json", "chrome"],
+        default="json",
+        help="write the profile as a JSON report or a Chrome trace",
+    )
+    parser.add_argument(
+        "--save-index",
+        metavar="PATH",
+        help="also save all release and drop dates for offline queries; "
+        "see support_index.py",
+    )
+    args = parser.parse_args(argv)
+
+    if args.backtest:
+        # Earlier schedules would miss the drops of Python releases older
+        # than those in py_releases
+        oldest, released = next(iter(python_release_dates().items()))
+        if cutoff_date(args.backtest) < released + support_time("python"):
+            parser.error(
+                f"--backtest {args.backtest:%Y-%m-%d} needs the drop dates of "
+                f"Python releases before {oldest}; add them to py_releases or "
+                "start later"
+            )
+
+    from simple_index import INDEX_URL, HTTPBackend, MirrorBackend, ResponseCache
+
+    cache = release_db = None
+    if not args.no_cache:
+        from release_db import ReleaseDB
+
+        cache = ResponseCache(
+            os.path.join(args.cache_dir, "simple"), offline=args.offline
+        )
+
+    if args.mirror:
+        backend = MirrorBackend(args.mirror)
+        source = os.path.abspath(args.mirror)
+    else:
+        source = args.index_url or INDEX_URL
+        backend = HTTPBackend(source, cache=cache, pool_size=args.max_workers)
+
+    if not args.no_cache:
+        release_db = ReleaseDB(
+            os.path.join(args.cache_dir, "releases.sqlite"), source=source
+        )
+
+    packages = core_packages
+    if args.packages_from:
+        from dependencies import collect_packages
+
+        packages = collect_packages(args.packages_from)
+        print(f"Found {len(packages)} packages in {', '.join(args.packages_from)}")
+    elif args.core_projects:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.tools"))
+        from spec_index import load_index
+
+        packages = load_index().pypi_names()
+
+    profile = None
+    if args.profile:
+        from profiling import Profile
+
+        profile = Profile()
+
+    with optional_span(profile, "fetch", packages=len(packages)):
+        requires_python = {} if args.ci_matrix else None
+        release_dates = {"python": python_release_dates()}
+        release_dates |= fetch(
+            packages,
+            backend=backend,
+            release_db=release_db,
+            max_workers=args.max_workers,
+            batched_parsing=args.engine == "pandas",
+            requires_python=requires_python,
+            profile=profile,
+        )
+
+    with optional_span(profile, "filter"):
+        package_releases = compute_support_window(release_dates, as_of=args.as_of)
+
+    if args.ci_matrix:
+        import json
+
+        from python_compat import ci_matrix, compatibility_matrix
+
+        print(f"Saving CI matrix to {args.ci_matrix}")
+        with optional_span(profile, "ci-matrix"):
+            matrix = compatibility_matrix(package_releases, requires_python, args.as_of)
+        with open(args.ci_matrix, "w") as fh:
+            json.dump(ci_matrix(matrix), fh, indent=2)
+
+    if args.backtest:
+        from schedules import drop_schedules, quarterly
+
+        as_of = quarterly(args.backtest, args.as_of or datetime.now())
+        path = os.path.join(args.output_dir, "backtest.csv")
+        print(f"Saving backtest.csv to {path}")
+        with optional_span(profile, "backtest"):
+            drop_schedules(release_dates, as_of).to_csv(path, index=False)
+
+    if args.package_months or args.python_months or args.cutoff_quarters:
+        from schedules import compare_scenarios, scenario_grid
+
+        scenarios = scenario_grid(
+            args.package_months or [24],
+            args.python_months or [36],
+            args.cutoff_quarters or [3],
+        )
+        path = os.path.join(args.output_dir, "scenarios.csv")
+        print(f"Saving {len(scenarios)} scenarios to {path}")
+        with optional_span(profile, "scenarios", scenarios=len(scenarios)):
+            table = compare_scenarios(
+                release_dates, scenarios, args.as_of or datetime.now()
+            )
+        table.to_csv(path)
+
+    if args.save_index:
+        from support_index import SupportIndex
+
+        print(f"Saving support index to {args.save_index}")
+        SupportIndex.from_release_dates(release_dates).save(args.save_index)
+
+    with optional_span(profile, "render", engine=args.engine):
+        output = render(package_releases, args.engine)
+    for filename, text in output.items():
+        path = os.path.join(args.output_dir, filename)
+        print(f"Saving {filename} to {path}")
+        with open(path, "w") as fh:
+            fh.write(text)
+
+    if profile is not None:
+        print(f"Saving profile to {args.profile}")
+        profile.save(args.profile, args.profile_format)
+
 
-    fh.write("\n\n".join(tb))
-    fh.write("\n")
+if __name__ == "__main__":
+    main()
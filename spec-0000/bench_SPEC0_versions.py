@@ -0,0 +1,188 @@
+"""
+Benchmark the SPEC 0 pipeline
+=============================
+
+Serves synthetic listings for 10, 100 and 1,000 packages from a local fake
+index, and times each stage of ``SPEC0_versions.py``:
+
+- fetch: download the listings
+- parse: find the release date of each version
+- filter: select the supported releases (`compute_support_window`)
+- render: format ``chart.md`` and ``schedule.md``
+
+The output for 10 packages is checked against the golden files in
+``testdata/``, and the output for every size must be the same on each run.
+Timings can be saved, and compared with a saved baseline::
+
+    python bench_SPEC0_versions.py --save baseline.json
+    python bench_SPEC0_versions.py --compare baseline.json
+
+Comparison fails if a stage is more than ``--tolerance`` times slower.
+
+With ``--startup``, the whole script is also run in a fresh interpreter on a
+mirror of the core packages with each ``--engine``, to compare the cost of
+importing pandas with that of the computation.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fake_index import FakeIndex, synthetic_index, synthetic_listing
+from release_dates import parse_release_dates_batched
+from simple_index import HTTPBackend, fetch_all, iter_files
+from SPEC0_versions import (
+    compute_support_window,
+    core_packages,
+    engines,
+    python_release_dates,
+    render,
+)
+
+AS_OF = datetime(2025, 11, 1)
+GOLDEN = Path(__file__).parent / "testdata"
+STAGES = ["fetch", "parse", "filter", "render"]
+
+
+def run_pipeline(packages, backend, max_workers=8):
+    """Run each stage once, returning the timings and the rendered output."""
+    timings = {}
+
+    tic = time.perf_counter()
+    bodies = fetch_all(
+        packages, lambda package: b"".join(backend.chunks(package)), max_workers
+    )
+    timings["fetch"] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    release_dates = {"python": python_release_dates()}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for package, body in bodies.items():
+            files = ((f["filename"], f["upload-time"]) for f in iter_files([body]))
+            dates = parse_release_dates_batched(package, files)
+            release_dates[package] = dict(sorted(dates.items()))
+    timings["parse"] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    package_releases = compute_support_window(release_dates, as_of=AS_OF)
+    timings["filter"] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    output = render(package_releases)
+    timings["render"] = time.perf_counter() - tic
+
+    return timings, output
+
+
+def bench(sizes=(10, 100, 1000), repeat=3):
+    golden = {path.name: path.read_text() for path in GOLDEN.glob("*.md")}
+    results = {}
+
+    for n_packages in sizes:
+        listings = synthetic_index(n_packages)
+        with FakeIndex(listings) as index:
+            backend = HTTPBackend(index.url)
+            best = dict.fromkeys(STAGES, float("inf"))
+            reference = None
+            for _ in range(repeat):
+                timings, output = run_pipeline(list(listings), backend)
+                best = {stage: min(best[stage], timings[stage]) for stage in STAGES}
+                assert reference is None or output == reference, "output changed"
+                reference = output
+
+        if n_packages == 10:
+            assert reference == golden, "output does not match testdata/"
+
+        results[str(n_packages)] = best
+        print(
+            f"{n_packages:>5} packages: "
+            + ", ".join(f"{stage} {best[stage] * 1000:8.1f} ms" for stage in STAGES)
+        )
+
+    return results
+
+
+def bench_startup(repeat=5):
+    """Time ``SPEC0_versions.py`` end to end with each engine."""
+    script = Path(__file__).parent / "SPEC0_versions.py"
+    best = dict.fromkeys(engines, float("inf"))
+    reference = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror = Path(tmp) / "mirror"
+        mirror.mkdir()
+        for package in core_packages:
+            listing = synthetic_listing(package, n_releases=40)
+            (mirror / f"{package}.json").write_text(json.dumps(listing))
+
+        for engine in engines:
+            output_dir = Path(tmp) / engine
+            output_dir.mkdir()
+            argv = [sys.executable, str(script), "--as-of", AS_OF.isoformat()]
+            argv += ["--mirror", str(mirror), "--no-cache", "--engine", engine]
+            argv += ["--output-dir", str(output_dir)]
+            for _ in range(repeat):
+                tic = time.perf_counter()
+                subprocess.run(argv, stdout=subprocess.DEVNULL, check=True)
+                best[engine] = min(best[engine], time.perf_counter() - tic)
+            output = {path.name: path.read_text() for path in output_dir.iterdir()}
+            assert reference is None or output == reference, "engines differ"
+            reference = output
+
+    print(
+        "      startup: "
+        + ", ".join(f"{engine} {best[engine] * 1000:8.1f} ms" for engine in engines)
+    )
+    return {"startup": best}
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for size, timings in results.items():
+        for stage, elapsed in timings.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference and elapsed > tolerance * reference:
+                regressions.append(
+                    f"{size} packages, {stage}: {elapsed * 1000:.1f} ms "
+                    f"(baseline {reference * 1000:.1f} ms)"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="save timings to this JSON file")
+    parser.add_argument("--compare", help="compare timings with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument(
+        "--startup", action="store_true", help="also time the script with each engine"
+    )
+    args = parser.parse_args(argv)
+
+    results = bench(args.sizes, args.repeat)
+    if args.startup:
+        results |= bench_startup(args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark parsing of release dates
+==================================
+
+Compares `parse_release_dates` and `parse_release_dates_batched` on a project
+listing. Pass a listing recorded with::
+
+    curl -H "Accept: application/vnd.pypi.simple.v1+json" \\
+        https://pypi.org/simple/numpy/ > numpy.json
+    python bench_release_dates.py numpy.json
+
+Without argument, a synthetic listing of similar size is used.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import timeit
+
+from fake_index import synthetic_listing
+from release_dates import (
+    _parse_version,
+    parse_release_dates,
+    parse_release_dates_batched,
+)
+
+
+def bench(listing, repeat=5):
+    files = [(f["filename"], f["upload-time"]) for f in listing["files"]]
+    print(f"{listing['name']}: {len(files)} files")
+
+    for parse in [parse_release_dates, parse_release_dates_batched]:
+
+        def run():
+            _parse_version.cache_clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                parse(listing["name"], files)
+
+        best = min(timeit.repeat(run, number=1, repeat=repeat))
+        print(f"  {parse.__name__:<28}: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as fh:
+            listing = json.load(fh)
+    else:
+        listing = synthetic_listing("numpy", n_releases=60, files_per_release=40)
+    bench(listing)
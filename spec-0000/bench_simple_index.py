@@ -0,0 +1,84 @@
+"""
+Benchmark fetching of project listings
+======================================
+
+Fetches synthetic listings from a local fake index that adds a fixed latency
+to every request, once sequentially and once with a bounded thread pool.
+Then compares the peak memory needed to decode listings of growing size as a
+whole and incrementally.
+
+    python bench_simple_index.py
+"""
+
+import json
+import time
+import tracemalloc
+
+from fake_index import FakeIndex, synthetic_listing
+from simple_index import CHUNK_SIZE, HTTPBackend, fetch_all, iter_files
+
+
+def bench(n_packages=100, latency=0.05, worker_counts=(1, 8, 32)):
+    packages = [f"package-{i:03d}" for i in range(n_packages)]
+    listings = {package: synthetic_listing(package) for package in packages}
+
+    with FakeIndex(listings, latency=latency) as index:
+        backend = HTTPBackend(index.url, pool_size=max(worker_counts))
+
+        def fetch(package):
+            return list(backend.iter_uploads(package))
+
+        reference = None
+        for max_workers in worker_counts:
+            tic = time.perf_counter()
+            result = fetch_all(packages, fetch, max_workers=max_workers)
+            elapsed = time.perf_counter() - tic
+
+            if reference is None:
+                reference = result
+            assert list(result) == packages
+            assert result == reference
+
+            print(
+                f"{n_packages} packages, {latency * 1000:.0f} ms latency, "
+                f"max_workers={max_workers:<3}: {elapsed:6.2f} s"
+            )
+
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(release_counts=(100, 1000, 10000)):
+    def decode(document):
+        listing = json.loads(document)
+        return [(f["filename"], f["upload-time"]) for f in listing["files"]]
+
+    def stream(document):
+        chunks = (
+            document[i : i + CHUNK_SIZE] for i in range(0, len(document), CHUNK_SIZE)
+        )
+        for f in iter_files(chunks):
+            f["filename"], f["upload-time"]
+
+    for n_releases in release_counts:
+        listing = synthetic_listing("numpy", n_releases=n_releases)
+        document = json.dumps(listing).encode()
+        n_files = len(listing["files"])
+        del listing
+
+        print(
+            f"{n_files:>6} files: "
+            f"json.loads {peak_memory(decode, document) / 2**20:7.2f} MiB, "
+            f"iter_files {peak_memory(stream, document) / 2**20:7.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    bench()
+    bench_memory()
@@ -0,0 +1,130 @@
+"""
+Packages of a Project
+=====================
+
+Read the packages a project depends on, to compute the SPEC 0 support windows
+of its whole dependency set instead of the core packages::
+
+    python SPEC0_versions.py --packages-from uv.lock
+    python SPEC0_versions.py --packages-from */pyproject.toml
+
+Lockfiles (``uv.lock``, ``pylock.toml``, ``poetry.lock``) list the transitive
+dependencies; ``pyproject.toml`` and requirements files only list the direct
+ones. Names from several files, e.g. every project of a monorepo, are
+normalized and deduplicated, so that each package is fetched once; the
+response cache and release database in ``--cache-dir`` are shared between
+runs and projects.
+"""
+
+import tomllib
+from pathlib import Path
+
+from packaging.requirements import InvalidRequirement, Requirement
+
+from simple_index import normalize
+
+
+def _names(requirements):
+    for requirement in requirements:
+        try:
+            yield Requirement(requirement).name
+        except InvalidRequirement:
+            continue
+
+
+def read_pyproject(data):
+    """Direct dependencies of a ``pyproject.toml``, with extras and groups."""
+    project = data.get("project", {})
+    yield from _names(project.get("dependencies", []))
+    for requirements in project.get("optional-dependencies", {}).values():
+        yield from _names(requirements)
+    for requirements in data.get("dependency-groups", {}).values():
+        # Skip {include-group = "..."} entries, whose packages are listed in
+        # their own group
+        yield from _names(r for r in requirements if isinstance(r, str))
+
+
+def read_uv_lock(data):
+    """Locked packages of a ``uv.lock`` that come from an index.
+
+    Projects of the workspace, and packages from a local directory, a path, a
+    Git repository or a URL, are not on the index and are skipped.
+    """
+    for package in data.get("package", []):
+        if "registry" in package.get("source", {}):
+            yield package["name"]
+
+
+def read_pylock(data):
+    """Locked packages of a PEP 751 ``pylock.toml`` that come from an index."""
+    for package in data.get("packages", []):
+        if not {"vcs", "directory", "archive"} & package.keys():
+            yield package["name"]
+
+
+def read_poetry_lock(data):
+    """Locked packages of a ``poetry.lock`` that come from an index."""
+    for package in data.get("package", []):
+        source = package.get("source", {})
+        if source.get("type") not in ("directory", "file", "git", "url"):
+            yield package["name"]
+
+
+def read_requirements_txt(path):
+    """Requirements of a pip requirements file, following ``-r`` includes."""
+    for line in Path(path).read_text().splitlines():
+        line = line.split(" #", 1)[0].strip()
+        if line.startswith(("-r ", "--requirement ")):
+            include = line.split(maxsplit=1)[1]
+            yield from read_requirements_txt(Path(path).parent / include)
+        elif line and not line.startswith(("#", "-")):
+            yield from _names([line])
+
+
+def read_packages(path):
+    """Names of the packages listed in a project or lock file.
+
+    Parameters
+    ----------
+    path : str or Path
+        A ``pyproject.toml``, ``uv.lock``, ``pylock.toml`` or
+        ``pylock.*.toml``, ``poetry.lock``, or any other file in the pip
+        requirements format.
+
+    Returns
+    -------
+    list of str
+        Normalized names, in the order of the file.
+
+    """
+    path = Path(path)
+    if path.name == "pyproject.toml":
+        reader = read_pyproject
+    elif path.name == "uv.lock":
+        reader = read_uv_lock
+    elif path.name.startswith("pylock.") and path.suffix == ".toml":
+        reader = read_pylock
+    elif path.name == "poetry.lock":
+        reader = read_poetry_lock
+    else:
+        return list(map(normalize, read_requirements_txt(path)))
+
+    with open(path, "rb") as fh:
+        return list(map(normalize, reader(tomllib.load(fh))))
+
+
+def collect_packages(paths):
+    """Deduplicated packages of several project or lock files.
+
+    Returns
+    -------
+    list of str
+        Normalized names, in order of first appearance. Python itself is
+        handled separately by ``SPEC0_versions.py`` and never included.
+
+    """
+    packages = dict.fromkeys(
+        package for path in paths for package in read_packages(path)
+    )
+    packages.pop("python", None)
+    return list(packages)
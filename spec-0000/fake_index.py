@@ -0,0 +1,162 @@
+"""
+Local Stand-in for a PEP 691 Simple Index
+=========================================
+
+Serves synthetic project listings over HTTP on localhost, so that the
+SPEC 0 tooling can be tested and benchmarked without network access.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from simple_index import SIMPLE_JSON
+
+
+def synthetic_listing(
+    package,
+    n_releases=20,
+    files_per_release=4,
+    start=datetime(2016, 1, 4),
+    interval=timedelta(days=91),
+):
+    """Build a PEP 691 listing resembling that of a real project.
+
+    Each minor release gets an sdist and `files_per_release` wheels uploaded
+    over a couple of days, followed by a bugfix release. Every fifth minor
+    release requires a newer Python.
+    """
+    name = package.replace("-", "_")
+    files = []
+    for i in range(n_releases):
+        released = start + i * interval
+        requires_python = f">=3.{5 + i // 5}"
+        for version, offset in [(f"1.{i}.0", 0), (f"1.{i}.1", 30)]:
+            uploaded = released + timedelta(days=offset)
+            files.append(
+                {
+                    "filename": f"{name}-{version}.tar.gz",
+                    "upload-time": f"{uploaded:%Y-%m-%dT%H:%M:%S.%fZ}",
+                    "requires-python": requires_python,
+                }
+            )
+            for j in range(files_per_release):
+                built = uploaded + timedelta(hours=j)
+                files.append(
+                    {
+                        "filename": f"{name}-{version}-cp3{j}-cp3{j}-any.whl",
+                        "upload-time": f"{built:%Y-%m-%dT%H:%M:%SZ}",
+                        "requires-python": requires_python,
+                    }
+                )
+    return {"meta": {"api-version": "1.1"}, "name": package, "files": files}
+
+
+def synthetic_index(n_packages, n_releases=40):
+    """Build listings for `n_packages` projects with staggered release dates.
+
+    Every other project releases twice as often as the others.
+    """
+    listings = {}
+    for i in range(n_packages):
+        package = f"package-{i:04d}"
+        frequency = 1 + i % 2
+        listings[package] = synthetic_listing(
+            package,
+            n_releases=n_releases * frequency,
+            start=datetime(2016, 1, 4) + timedelta(days=17 * i % 365),
+            interval=timedelta(days=91 // frequency),
+        )
+    return listings
+
+
+class _Server(ThreadingHTTPServer):
+    # Accept bursts of connections from large thread pools
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeIndex:
+    """Serve project listings on a local port until the context exits.
+
+    Parameters
+    ----------
+    listings : dict
+        Maps project names to PEP 691 JSON documents.
+    latency : float
+        Seconds to wait before answering each request, to mimic a round trip
+        to a remote index.
+    failures : int
+        Number of requests to answer with ``503 Service Unavailable`` before
+        answering normally.
+
+    Attributes
+    ----------
+    url : str
+        Base URL of the simple index, available inside the context.
+    requests : list of str
+        Paths requested so far.
+    not_modified : int
+        Number of conditional requests answered with ``304 Not Modified``.
+
+    Listings are served with an ``ETag`` and a ``Last-Modified`` header, and
+    conditional requests are honoured. Replace an entry of `listings` to
+    publish a new release.
+
+    """
+
+    last_modified = "Mon, 06 Jan 2025 00:00:00 GMT"
+
+    def __init__(self, listings, latency=0.0, failures=0):
+        self.listings = listings
+        self.latency = latency
+        self.failures = failures
+        self.requests = []
+        self.not_modified = 0
+
+    def __enter__(self):
+        index = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                index.requests.append(self.path)
+                time.sleep(index.latency)
+                if len(index.requests) <= index.failures:
+                    self.send_error(503)
+                    return
+                package = self.path.strip("/").split("/")[-1]
+                if package not in index.listings:
+                    self.send_error(404)
+                    return
+                body = json.dumps(index.listings[package]).encode()
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    index.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", SIMPLE_JSON)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", index.last_modified)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.start()
+        self.url = f"http://127.0.0.1:{self._server.server_port}/simple"
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
@@ -0,0 +1,138 @@
+"""
+Profiling the SPEC 0 Generator
+==============================
+
+Record how long each stage of ``SPEC0_versions.py`` takes, and for each
+package how long its listing took to read and parse, its size in bytes, how
+many of those bytes were downloaded, whether it came from the response cache,
+how many files it had, and how many files had an invalid version or date::
+
+    python SPEC0_versions.py --profile profile.json
+    python SPEC0_versions.py --profile trace.json --profile-format chrome
+
+The JSON report lists every timed span with its counters. The Chrome trace
+can be opened in ``chrome://tracing`` or https://ui.perfetto.dev, where
+packages fetched concurrently appear on the thread that fetched them.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+from simple_index import Backend
+
+
+class Profile:
+    """Thread-safe recorder of timed spans and their counters.
+
+    Attributes
+    ----------
+    spans : list of dict
+        Completed spans, with their ``name``, ``category``, ``start`` and
+        ``duration`` in seconds since the profile was created, ``thread`` and
+        counters (``args``).
+
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, category="stage", **args):
+        """Time the body of a ``with`` block.
+
+        Yields
+        ------
+        dict
+            The counters of the span, initialized with `args`, which the
+            block may update.
+
+        """
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            span = {
+                "name": name,
+                "category": category,
+                "start": start - self.origin,
+                "duration": end - start,
+                "thread": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.spans.append(span)
+
+    def instrument(self, backend, counters):
+        """Wrap `backend` to count the size and read time of listings.
+
+        Both are added to `counters`, under ``"listing_bytes"`` and
+        ``"fetch_seconds"``. They include listings read from a mirror or from
+        the response cache, so they measure what was parsed. Network traffic
+        is counted separately, under ``"network_bytes"``, and ``"cached"`` is
+        True for listings served from the response cache, fresh or after a
+        ``304 Not Modified``. The wrapper always streams listings through
+        `Backend.chunks`, even for backends with a faster `iter_uploads`.
+        """
+        return _ProfiledBackend(backend, counters)
+
+    def to_json(self):
+        """Return the spans in start order, as a JSON-serializable dict."""
+        return {"spans": sorted(self.spans, key=lambda span: span["start"])}
+
+    def to_chrome_trace(self):
+        """Return the spans as Chrome Trace Event Format complete events."""
+        threads = {}
+        events = []
+        for span in sorted(self.spans, key=lambda span: span["start"]):
+            tid = threads.setdefault(span["thread"], len(threads))
+            events.append(
+                {
+                    "name": span["name"],
+                    "cat": span["category"],
+                    "ph": "X",
+                    "ts": span["start"] * 1e6,
+                    "dur": span["duration"] * 1e6,
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": span["args"],
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path, format="json"):
+        """Write the profile to `path` as ``"json"`` or ``"chrome"`` trace."""
+        data = self.to_chrome_trace() if format == "chrome" else self.to_json()
+        with open(path, "w") as fh:
+            json.dump(data, fh, indent=1)
+
+
+class _ProfiledBackend(Backend):
+    def __init__(self, backend, counters):
+        self.backend = backend
+        self.counters = counters
+        counters.setdefault("listing_bytes", 0)
+        counters.setdefault("fetch_seconds", 0.0)
+        counters.setdefault("network_bytes", 0)
+        counters.setdefault("cached", False)
+
+    def __str__(self):
+        return str(self.backend)
+
+    def chunks(self, package, stats=None):
+        # Only time spent waiting for the backend counts as fetching; parsing
+        # happens while the listing streams in
+        chunks = iter(self.backend.chunks(package, self.counters))
+        while True:
+            tic = time.perf_counter()
+            chunk = next(chunks, None)
+            self.counters["fetch_seconds"] += time.perf_counter() - tic
+            if chunk is None:
+                return
+            self.counters["listing_bytes"] += len(chunk)
+            yield chunk
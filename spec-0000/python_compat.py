@@ -0,0 +1,154 @@
+"""
+Python Compatibility of Releases
+================================
+
+Find which of the supported Python versions each supported package release
+can be installed on, from the ``requires-python`` metadata of the files in
+its simple index listing, and turn the result into a CI matrix::
+
+    python SPEC0_versions.py --ci-matrix matrix.json
+
+The metadata is collected while the listings are read for release dates, so
+no extra request is made. A handful of distinct specifiers are shared by
+thousands of files, so parsing and evaluating them is cached.
+"""
+
+import functools
+from datetime import datetime
+
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+
+from release_dates import _parse_version
+
+
+@functools.lru_cache(maxsize=None)
+def specifier_set(requires_python):
+    """Parse a ``requires-python`` string, or return None if it is invalid."""
+    try:
+        return SpecifierSet(requires_python or "")
+    except InvalidSpecifier:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def compatible_pythons(requires_python, pythons):
+    """Select the Python versions allowed by a ``requires-python`` string.
+
+    Parameters
+    ----------
+    requires_python : str or None
+        Version specifier of a release. None, empty and invalid specifiers
+        allow every version.
+    pythons : tuple of str
+        Python minor versions, such as ``"3.12"``.
+
+    Returns
+    -------
+    tuple of str
+        The versions in `pythons` with at least one allowed patch release.
+
+    """
+    spec = specifier_set(requires_python)
+    if not spec:
+        return pythons
+    # Check the first and a late patch release, so that e.g. ">=3.9.1" still
+    # allows 3.9 and "<3.12.0" does not allow 3.12
+    return tuple(
+        python
+        for python in pythons
+        if spec.contains(python, prereleases=True)
+        or spec.contains(f"{python}.99", prereleases=True)
+    )
+
+
+def record_requires_python(files, requires_python):
+    """Collect the ``requires-python`` of each version while streaming files.
+
+    Parameters
+    ----------
+    files : iterable of tuple
+        ``(filename, upload-time, requires-python)`` triples.
+    requires_python : dict
+        Updated with `Version` to ``requires-python`` string. The first file of
+        each version that has one wins; files of a release normally share it.
+
+    Yields
+    ------
+    tuple of str
+        The ``(filename, upload-time)`` pairs of `files`, for the release
+        date parsers.
+
+    """
+    for filename, upload_time, spec in files:
+        if spec:
+            parts = filename.split("-")
+            version = _parse_version(parts[1]) if len(parts) > 1 else None
+            if version is not None:
+                requires_python.setdefault(version, spec)
+        yield filename, upload_time
+
+
+def compatibility_matrix(package_releases, requires_python, as_of=None):
+    """Python versions compatible with each supported package release.
+
+    Parameters
+    ----------
+    package_releases : dict
+        Output of `SPEC0_versions.compute_support_window`. Its ``"python"``
+        entry lists the Python versions considered.
+    requires_python : dict
+        Maps each package to ``{Version: requires-python}``, as collected by
+        `record_requires_python`.
+    as_of : datetime, optional
+        Date of `package_releases`. Defaults to now. Releases, of packages and
+        of Python, dropped by then are left out, although
+        `compute_support_window` keeps them to show recent drops.
+
+    Returns
+    -------
+    dict
+        Maps each package to ``{version: [python, ...]}``, in the order of
+        `package_releases`. Releases without metadata are assumed to support
+        every Python version.
+
+    """
+    as_of = as_of or datetime.now()
+    supported = {
+        package: [
+            version for version, dates in releases.items() if dates["drop_date"] > as_of
+        ]
+        for package, releases in package_releases.items()
+    }
+    pythons = tuple(supported.get("python", []))
+    return {
+        package: {
+            version: list(
+                compatible_pythons(
+                    requires_python.get(package, {}).get(version), pythons
+                )
+            )
+            for version in releases
+        }
+        for package, releases in supported.items()
+        if package != "python"
+    }
+
+
+def ci_matrix(matrix):
+    """Flatten a compatibility matrix into a GitHub Actions ``include`` list.
+
+    Returns
+    -------
+    dict
+        ``{"include": [{"package": ..., "version": ..., "python-version": ...}]}``
+        with one entry per compatible combination.
+
+    """
+    return {
+        "include": [
+            {"package": package, "version": str(version), "python-version": python}
+            for package, releases in matrix.items()
+            for version, pythons in releases.items()
+            for python in pythons
+        ]
+    }
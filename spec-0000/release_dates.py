@@ -0,0 +1,172 @@
+"""
+Release Dates from Index Files
+==============================
+
+Find the release date of each version of a package, i.e. the earliest upload
+time among its files, from the ``(filename, upload-time)`` pairs of a simple
+index listing. Only final ``X.Y.0`` releases are considered.
+"""
+
+import functools
+import itertools
+import threading
+from datetime import datetime
+
+from packaging.version import InvalidVersion, Version
+
+# Messages are printed from the worker threads of `simple_index.fetch_all`, and
+# concurrent writes to `sys.stdout` can corrupt its buffer on some versions of
+# CPython
+_print_lock = threading.Lock()
+
+
+def _print(*args):
+    with _print_lock:
+        print(*args)
+
+
+def parse_release_dates(package, files, stats=None):
+    """Parse index files one at a time.
+
+    Parameters
+    ----------
+    package : str
+        Package name, used in error messages.
+    files : iterable of tuple
+        ``(filename, upload-time)`` pairs, consumed lazily.
+    stats : dict, optional
+        Incremented with the number of files parsed (``"files"``), and of
+        files with an invalid version or date (``"invalid_versions"``,
+        ``"invalid_dates"``).
+
+    Returns
+    -------
+    dict
+        Maps `Version` to the earliest upload `datetime` of its files.
+
+    """
+    # Only the earliest upload date of each version is kept, so memory use does
+    # not grow with the number of files
+    file_date = {}
+    n_files = n_invalid = n_bad_dates = 0
+    for filename, upload_time in files:
+        n_files += 1
+        ver = filename.split("-")[1]
+        try:
+            version = Version(ver)
+        except InvalidVersion as e:
+            _print(f"Error: '{ver}' is an invalid version for '{package}'. Reason: {e}")
+            n_invalid += 1
+            continue
+
+        if version.is_prerelease or version.micro != 0:
+            continue
+
+        release_date = None
+        for format in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"]:
+            try:
+                release_date = datetime.strptime(upload_time, format)
+            except ValueError as e:
+                _print(f"Error parsing invalid date: {e}")
+
+        if not release_date:
+            n_bad_dates += 1
+            continue
+
+        if version not in file_date or release_date < file_date[version]:
+            file_date[version] = release_date
+
+    _count(stats, files=n_files, invalid_versions=n_invalid, invalid_dates=n_bad_dates)
+    return file_date
+
+
+def _count(stats, **counts):
+    if stats is not None:
+        for key, n in counts.items():
+            stats[key] = stats.get(key, 0) + n
+
+
+# Bounded, as version strings of all the packages fetched go through it
+@functools.lru_cache(maxsize=4096)
+def _parse_version(ver):
+    try:
+        return Version(ver)
+    except InvalidVersion:
+        return None
+
+
+def parse_release_dates_batched(package, files, stats=None, chunk_size=10_000):
+    """Parse the index files of a package in batches.
+
+    Gives the same result as `parse_release_dates`, but parses each distinct
+    version string only once, converts the upload times of a batch in a
+    single call to `pandas.to_datetime`, and finds the earliest upload of each
+    version with one ``groupby`` per batch. Parse errors are reported in a
+    single summary line.
+
+    Parameters
+    ----------
+    package : str
+        Package name, used in error messages.
+    files : iterable of tuple
+        ``(filename, upload-time)`` pairs, consumed lazily.
+    stats : dict, optional
+        Incremented with the same counts as in `parse_release_dates`.
+    chunk_size : int
+        Number of files per batch. Only one batch is held in memory at a time,
+        besides the earliest date of each version, so memory use does not grow
+        with the number of files.
+
+    Returns
+    -------
+    dict
+        Maps `Version` to the earliest upload `datetime` of its files.
+
+    """
+    import pandas as pd
+
+    invalid = {}  # strings, ordered to report the first one
+    releases = {}
+    file_date = {}
+    n_files = n_invalid = n_bad_dates = 0
+    files = iter(files)
+    while chunk := list(itertools.islice(files, chunk_size)):
+        df = pd.DataFrame(chunk, columns=["filename", "upload_time"])
+        ver = df["filename"].str.split("-", n=2).str[1]
+
+        for s in ver.unique():
+            # File names without "-" have no version, and are counted below
+            if not isinstance(s, str) or s in releases or s in invalid:
+                continue
+            version = _parse_version(s)
+            if version is None:
+                invalid[s] = None
+            elif not version.is_prerelease and version.micro == 0:
+                releases[s] = version
+
+        selected = ver.isin(list(releases))
+        dates = pd.to_datetime(
+            df["upload_time"][selected], format="ISO8601", utc=True, errors="coerce"
+        ).dt.tz_convert(None)
+        earliest = dates.groupby(ver[selected]).min().dropna()
+
+        n_files += len(df)
+        n_invalid += int(ver.isin(list(invalid)).sum() + ver.isna().sum())
+        n_bad_dates += int(dates.isna().sum())
+
+        # Distinct strings may spell the same version, e.g. "1.0" and "1.0.0"
+        for s, date in earliest.items():
+            version = releases[s]
+            date = date.to_pydatetime()
+            if version not in file_date or date < file_date[version]:
+                file_date[version] = date
+
+    if n_invalid:
+        example = f", e.g. '{next(iter(invalid))}'" if invalid else ""
+        _print(
+            f"Error: {n_invalid} files of '{package}' have an invalid version" + example
+        )
+    if n_bad_dates:
+        _print(f"Error: {n_bad_dates} files of '{package}' have an invalid date")
+    _count(stats, files=n_files, invalid_versions=n_invalid, invalid_dates=n_bad_dates)
+    return file_date
@@ -0,0 +1,182 @@
+"""
+SPEC 0 Release Database
+=======================
+
+A small SQLite store of the release date of every package version seen by
+``SPEC0_versions.py``, so that later runs only parse files uploaded since the
+previous one.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from packaging.utils import canonicalize_version
+from packaging.version import Version
+
+
+# Versions are keyed by their canonical form, in which e.g. "1.0" and "1.0.0"
+# are both "1"; `version` keeps the spelling first merged
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    source TEXT NOT NULL,
+    package TEXT NOT NULL,
+    version_key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    release_date TEXT NOT NULL,
+    PRIMARY KEY (source, package, version_key)
+);
+CREATE TABLE IF NOT EXISTS packages (
+    source TEXT NOT NULL,
+    package TEXT NOT NULL,
+    last_upload TEXT NOT NULL,
+    PRIMARY KEY (source, package)
+);
+"""
+
+
+class ReleaseDB:
+    """Release dates of package versions, persisted in SQLite.
+
+    The database records, for each package, the ``upload-time`` of the most
+    recent file merged so far. Callers use it to skip files that were already
+    accounted for::
+
+        dates = parse_release_dates(package, db.new_files(package, files))
+        db.merge(package, dates)
+
+    Parameters
+    ----------
+    path : str or Path
+        Location of the database file. Use ``":memory:"`` for a throwaway
+        database.
+    source : str
+        Index URL or mirror path the files come from. Sources may list
+        different files for a package, so each one has its own release dates
+        and last upload times in the database.
+
+    """
+
+    def __init__(self, path, source=""):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.source = source
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending = {}
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def packages(self):
+        """Names of all packages of the source in the database."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT package FROM packages WHERE source = ? ORDER BY package",
+                (self.source,),
+            )
+            return [package for (package,) in rows]
+
+    def last_upload(self, package):
+        """Upload time of the most recent file merged for `package`, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_upload FROM packages WHERE source = ? AND package = ?",
+                (self.source, package),
+            ).fetchone()
+        return row[0] if row else None
+
+    def new_files(self, package, files):
+        """Select the files uploaded since the last merge for `package`.
+
+        Files uploaded during the same second as the last merged file are
+        kept, since merging them again does not change any release date.
+        Files without an upload time, which the index need not give, are
+        skipped, as they give no release date. The latest upload time seen is
+        recorded by the next call to `merge`.
+
+        Parameters
+        ----------
+        package : str
+            Package name.
+        files : iterable of tuple
+            ``(filename, upload-time)`` pairs, consumed lazily.
+
+        Yields
+        ------
+        tuple
+            The pairs of `files` that still need to be merged.
+
+        """
+        since = self.last_upload(package)
+        latest = since
+        for filename, upload_time in files:
+            if upload_time is None:
+                continue
+            if since is None or upload_time[:19] >= since[:19]:
+                if latest is None or upload_time > latest:
+                    latest = upload_time
+                    self._pending[package] = latest
+                yield filename, upload_time
+
+    def merge(self, package, release_dates):
+        """Merge newly parsed release dates into the database.
+
+        Parameters
+        ----------
+        package : str
+            Package name.
+        release_dates : dict
+            Maps `Version` to the earliest upload `datetime` among the files
+            selected by `new_files`. Versions already in the database, however
+            spelled, keep the earlier of both dates.
+
+        """
+        last_upload = self._pending.pop(package, None)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO releases
+                    (source, package, version_key, version, release_date)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source, package, version_key) DO UPDATE
+                SET release_date = min(release_date, excluded.release_date)
+                """,
+                [
+                    (
+                        self.source,
+                        package,
+                        canonicalize_version(version),
+                        str(version),
+                        date.isoformat(),
+                    )
+                    for version, date in release_dates.items()
+                ],
+            )
+            if last_upload is not None:
+                self._conn.execute(
+                    """
+                    INSERT INTO packages (source, package, last_upload)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (source, package) DO UPDATE
+                    SET last_upload = max(last_upload, excluded.last_upload)
+                    """,
+                    (self.source, package, last_upload),
+                )
+
+    def release_dates(self, package):
+        """All recorded release dates of `package`, as ``{Version: datetime}``."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT version, release_date FROM releases
+                WHERE source = ? AND package = ?
+                """,
+                (self.source, package),
+            ).fetchall()
+        return {
+            Version(version): datetime.fromisoformat(date) for version, date in rows
+        }
@@ -0,0 +1,197 @@
+"""
+SPEC 0 Schedules for Many Dates
+===============================
+
+Compute the drop schedules that ``SPEC0_versions.py`` would have produced at
+many evaluation dates, e.g. every quarter since 2019, from a single set of
+release dates. All dates are handled together in one vectorized pass over a
+table of releases, instead of one run of the script per date.
+"""
+
+import pandas as pd
+from packaging.version import Version
+
+from SPEC0_versions import support_time
+
+
+def release_frame(release_dates):
+    """Flatten ``{package: {version: release date}}`` into a DataFrame.
+
+    The result has columns ``package``, ``version``, ``release`` and ``drop``,
+    the end of the support window of each release.
+    """
+    rows = [
+        (package, version, release)
+        for package, dates in release_dates.items()
+        for version, release in dates.items()
+    ]
+    releases = pd.DataFrame(rows, columns=["package", "version", "release"])
+    releases["release"] = pd.to_datetime(releases["release"])
+    releases["drop"] = releases["release"] + releases["package"].map(support_time)
+    return releases
+
+
+def cutoff_dates(as_of):
+    """Vectorized `SPEC0_versions.cutoff_date`: three quarters before `as_of`."""
+    quarters = pd.DatetimeIndex(as_of).to_period("Q")
+    return (quarters - 3).start_time
+
+
+def drop_schedules(release_dates, as_of):
+    """Compute the drop schedule at each of several evaluation dates.
+
+    Parameters
+    ----------
+    release_dates : dict
+        Maps each package, including ``"python"``, to ``{version: release date}``.
+    as_of : sequence of datetime
+        Evaluation dates.
+
+    Returns
+    -------
+    DataFrame
+        One row per evaluation date, quarter and package, as in ``schedule.md``:
+        the range of versions to drop that quarter (``min_version`` and
+        ``max_version``) and of their release dates (``first_release`` and
+        ``last_release``). Only releases made by each evaluation date are
+        included, as SPEC 0 would have recommended at the time.
+
+    """
+    dates = pd.DataFrame({"as_of": pd.DatetimeIndex(as_of)})
+    dates["cutoff"] = cutoff_dates(dates["as_of"])
+
+    df = dates.merge(release_frame(release_dates), how="cross")
+    df = df[(df["release"] <= df["as_of"]) & (df["drop"] > df["cutoff"])].copy()
+    df["quarter"] = df["drop"].dt.to_period("Q")
+
+    # As in schedule.md, the first quarter of each schedule is left out, since
+    # some of its releases may already have been filtered out
+    first_quarter = df.groupby("as_of")["quarter"].transform("min")
+    df = df[df["quarter"] != first_quarter]
+
+    return (
+        df.groupby(["as_of", "quarter", "package"])
+        .agg(
+            min_version=("version", "min"),
+            max_version=("version", "max"),
+            first_release=("release", "min"),
+            last_release=("release", "max"),
+        )
+        .reset_index()
+    )
+
+
+def quarterly(start, end):
+    """Evaluation dates at the start of each quarter from `start` to `end`."""
+    return pd.date_range(pd.Timestamp(start).to_period("Q").start_time, end, freq="QS")
+
+
+def scenario_grid(package_months=(24,), python_months=(36,), cutoff_quarters=(3,)):
+    """All combinations of support windows and cutoff rules.
+
+    Parameters
+    ----------
+    package_months : sequence of int
+        Support windows of packages, in months.
+    python_months : sequence of int
+        Support windows of Python, in months.
+    cutoff_quarters : sequence of int
+        How many quarters before the evaluation date recently dropped releases
+        are still listed. ``SPEC0_versions.py`` uses 3.
+
+    Returns
+    -------
+    list of dict
+        Scenarios, as accepted by `sweep`.
+
+    """
+    return [
+        {
+            "name": f"{package}m/{python}m/{quarters}q",
+            "package_months": package,
+            "python_months": python,
+            "cutoff_quarters": quarters,
+        }
+        for package in package_months
+        for python in python_months
+        for quarters in cutoff_quarters
+    ]
+
+
+def _days(months):
+    # Same convention as SPEC0_versions.plus24 and plus36
+    return int(365 * months / 12)
+
+
+def sweep(release_dates, scenarios, as_of):
+    """Evaluate support-window scenarios against one set of release dates.
+
+    Parameters
+    ----------
+    release_dates : dict
+        Maps each package, including ``"python"``, to ``{version: release date}``.
+    scenarios : list of dict
+        Each scenario has a ``name``, ``package_months`` and ``python_months``,
+        and optionally ``cutoff_quarters`` (default 3) and ``overrides``, a
+        dict mapping package names to their own window in months.
+    as_of : datetime
+        Evaluation date.
+
+    Returns
+    -------
+    DataFrame
+        One row per scenario and listed release made by `as_of`, with its
+        ``drop`` date and drop ``quarter``.
+
+    """
+    table = pd.DataFrame(
+        [
+            (
+                s["name"],
+                _days(s["package_months"]),
+                _days(s["python_months"]),
+                s.get("cutoff_quarters", 3),
+            )
+            for s in scenarios
+        ],
+        columns=["scenario", "package_days", "python_days", "cutoff_quarters"],
+    )
+    overrides = pd.DataFrame(
+        [
+            (s["name"], package, _days(months))
+            for s in scenarios
+            for package, months in s.get("overrides", {}).items()
+        ],
+        columns=["scenario", "package", "days"],
+    )
+
+    quarter = pd.Timestamp(as_of).to_period("Q")
+    table["cutoff"] = [(quarter - q).start_time for q in table["cutoff_quarters"]]
+
+    releases = release_frame(release_dates).drop(columns="drop")
+    df = table.merge(releases, how="cross")
+    df = df.merge(overrides, on=["scenario", "package"], how="left")
+    default = df["package_days"].where(df["package"] != "python", df["python_days"])
+    days = df["days"].astype("float64").fillna(default).astype("int64")
+    df["drop"] = df["release"] + pd.to_timedelta(days, unit="D")
+
+    df = df[(df["release"] <= pd.Timestamp(as_of)) & (df["drop"] > df["cutoff"])]
+    df = df.copy()
+    df["quarter"] = df["drop"].dt.to_period("Q")
+    return df[["scenario", "package", "version", "release", "drop", "quarter"]]
+
+
+def compare_scenarios(release_dates, scenarios, as_of):
+    """Tabulate the drop quarter of each release under each scenario.
+
+    See `sweep` for the parameters. Returns a DataFrame indexed by package and
+    version, with one column per scenario. Releases that a scenario does not
+    list are left empty.
+    """
+    df = sweep(release_dates, scenarios, as_of)
+    df["quarter"] = df["quarter"].astype(str)
+    order = {package: i for i, package in enumerate(release_dates)}
+    table = df.pivot(index=["package", "version"], columns="scenario", values="quarter")
+    table = table.reindex(columns=[s["name"] for s in scenarios])
+    rows = sorted(table.index, key=lambda row: (order[row[0]], Version(str(row[1]))))
+    return table.reindex(rows)
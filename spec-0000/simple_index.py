@@ -0,0 +1,551 @@
+"""
+PyPI Simple Index Access
+========================
+
+Helpers used by ``SPEC0_versions.py`` to read project listings from a
+PEP 691 JSON simple index such as https://pypi.org/simple.
+
+Listings are read through a backend: `HTTPBackend` queries an index over
+HTTP, `MirrorBackend` reads listings saved on the local disk, and
+`FixtureBackend` serves listings held in memory.
+"""
+
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+
+INDEX_URL = "https://pypi.org/simple"
+SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
+
+# Number of requests in flight at the same time
+MAX_WORKERS = 8
+
+# Size of the blocks in which responses are streamed, in bytes
+CHUNK_SIZE = 2**16
+
+# Keys of the file entries needed to find release dates
+UPLOAD_FIELDS = ("filename", "upload-time")
+
+
+def _record(stats, cached):
+    # Record in `stats`, if given, whether a listing came from the cache
+    if stats is not None:
+        stats["cached"] = cached
+        stats.setdefault("network_bytes", 0)
+
+
+def _counted(chunks, stats):
+    # Add the size of the downloaded `chunks` to `stats` as they are read
+    for chunk in chunks:
+        if stats is not None:
+            stats["network_bytes"] = stats.get("network_bytes", 0) + len(chunk)
+        yield chunk
+
+
+class ResponseCache:
+    """On-disk cache of index responses, revalidated with conditional requests.
+
+    Each entry keeps the response body together with its ``ETag`` and
+    ``Last-Modified`` headers. Once an entry is older than `ttl`, it is
+    revalidated with ``If-None-Match``/``If-Modified-Since``, so an unchanged
+    project costs a single ``304 Not Modified`` round trip.
+
+    Parameters
+    ----------
+    path : str or Path
+        Directory holding the cache. Created if it does not exist.
+    ttl : float
+        Seconds during which an entry is used without contacting the index.
+    max_size : int
+        Maximum total size of the cached bodies, in bytes. The least recently
+        used entries are evicted when it is exceeded. The sizes of the bodies
+        on disk are read on the first download, then kept up to date, so
+        downloads do not list the cache directory.
+    offline : bool
+        Never contact the index; serve every request from the cache, however
+        old the entry.
+
+    """
+
+    def __init__(self, path, ttl=0, max_size=512 * 2**20, offline=False):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._sizes = None  # body path -> size, see `_scan`
+        self._total = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.path / f"{key}.body", self.path / f"{key}.meta"
+
+    def _load(self, url):
+        body_path, meta_path = self._entry(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = open(body_path, "rb")
+        except (FileNotFoundError, ValueError):
+            return None, None
+        if meta.get("url") != url:
+            body.close()
+            return None, None
+        # The modification time of the body records its last use
+        try:
+            os.utime(body_path)
+        except FileNotFoundError:
+            pass
+        return meta, body
+
+    def _write(self, path, chunks):
+        # Returns the number of bytes written
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            for chunk in chunks:
+                size += fh.write(chunk)
+        os.replace(tmp, path)
+        return size
+
+    def _scan(self):
+        # Read the sizes of the bodies on disk, once; call with the lock held
+        if self._sizes is None:
+            self._sizes = {}
+            for body_path in self.path.glob("*.body"):
+                try:
+                    self._sizes[body_path] = body_path.stat().st_size
+                except FileNotFoundError:
+                    continue
+            self._total = sum(self._sizes.values())
+
+    def _track(self, body_path, size):
+        # Record the size of a body just written
+        with self._lock:
+            self._scan()
+            self._total += size - self._sizes.get(body_path, 0)
+            self._sizes[body_path] = size
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits `max_size`."""
+        with self._lock:
+            self._scan()
+            if self._total <= self.max_size:
+                return
+
+            entries = []
+            for body_path, size in self._sizes.items():
+                try:
+                    mtime = body_path.stat().st_mtime
+                except FileNotFoundError:
+                    mtime = 0  # removed by another process; forget it first
+                entries.append((mtime, size, body_path))
+
+            for _, size, body_path in sorted(entries):
+                if self._total <= self.max_size:
+                    break
+                if body_path == keep:
+                    continue
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix(".meta").unlink(missing_ok=True)
+                del self._sizes[body_path]
+                self._total -= size
+
+    def open(self, url, headers=None, session=None, stats=None):
+        """Open the body of the response to ``GET url`` for reading.
+
+        The body is streamed to disk when downloaded, so it is never held in
+        memory as a whole.
+
+        Parameters
+        ----------
+        url : str
+            URL to fetch.
+        headers : dict, optional
+            Extra request headers, e.g. ``Accept``.
+        session : requests.Session, optional
+            Session used to send the request.
+        stats : dict, optional
+            Set ``"cached"`` to whether the body was served from the cache,
+            fresh or after a ``304 Not Modified``, and increment
+            ``"network_bytes"`` with the size of the body downloaded, if any.
+
+        Returns
+        -------
+        file object
+            The cached or freshly downloaded body, opened in binary mode.
+
+        """
+        headers = dict(headers or {})
+        meta, body = self._load(url)
+
+        if self.offline:
+            if body is None:
+                raise FileNotFoundError(f"{url} is not cached (offline mode)")
+            _record(stats, cached=True)
+            return body
+
+        if body is not None:
+            if time.time() - meta["fetched"] < self.ttl:
+                _record(stats, cached=True)
+                return body
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last-modified"):
+                headers["If-Modified-Since"] = meta["last-modified"]
+
+        body_path, meta_path = self._entry(url)
+        get = requests.get if session is None else session.get
+        with get(url, headers=headers, stream=True) as response:
+            if response.status_code == 304 and body is not None:
+                meta["fetched"] = time.time()
+                self._write(meta_path, [json.dumps(meta).encode()])
+                _record(stats, cached=True)
+                return body
+            if body is not None:
+                body.close()
+            response.raise_for_status()
+
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last-modified": response.headers.get("Last-Modified"),
+                "fetched": time.time(),
+            }
+            _record(stats, cached=False)
+            size = self._write(
+                body_path, _counted(response.iter_content(CHUNK_SIZE), stats)
+            )
+            self._write(meta_path, [json.dumps(meta).encode()])
+
+        body = open(body_path, "rb")
+        self._track(body_path, size)
+        self.evict(keep=body_path)
+        return body
+
+
+def fetch_all(packages, fetch, max_workers=MAX_WORKERS):
+    """Call ``fetch(package)`` for several packages using a bounded thread pool.
+
+    Parameters
+    ----------
+    packages : iterable of str
+        Package names. Duplicates are fetched only once.
+    fetch : callable, f(package)
+        Called once per package, possibly from a worker thread.
+    max_workers : int
+        Maximum number of concurrent calls. With ``1``, packages are
+        fetched one after the other in the calling thread.
+
+    Returns
+    -------
+    dict
+        Maps each package to ``fetch(package)``. Keys are in the order given by
+        `packages`, whatever order the calls complete in, so output built from
+        the result is deterministic.
+
+    """
+    packages = list(dict.fromkeys(packages))
+    if max_workers <= 1:
+        return {package: fetch(package) for package in packages}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(packages, executor.map(fetch, packages)))
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_files(chunks):
+    """Incrementally parse the file entries of a PEP 691 JSON document.
+
+    Only one entry of the ``"files"`` array, plus one block of input, is held
+    in memory at a time, so memory use does not depend on the number of files
+    of the project.
+
+    Parameters
+    ----------
+    chunks : iterable of bytes
+        The UTF-8 encoded document, in blocks of any size.
+
+    Yields
+    ------
+    dict
+        Each entry of ``"files"``, as soon as it has been read completely.
+
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        # Drop what has been consumed and append the next block
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            text = utf8.decode(b"", final=True)
+        else:
+            text = utf8.decode(chunk)
+        buf = buf[pos:] + text
+        pos = 0
+        return True
+
+    def peek():
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(chars):
+        nonlocal pos
+        char = peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, got {char!r}")
+        pos += 1
+        return char
+
+    def value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A number ending the buffer may continue in the next block
+            if end == len(buf) and fill():
+                continue
+            pos = end
+            return obj
+
+    expect("{")
+    if peek() == "}":
+        return
+    while True:
+        key = value()
+        expect(":")
+        if key != "files":
+            value()
+        else:
+            expect("[")
+            if peek() == "]":
+                pos += 1
+            else:
+                while True:
+                    yield value()
+                    if expect(",]") == "]":
+                        break
+        if expect(",}") == "}":
+            return
+
+
+_NON_ALPHANUMERIC = re.compile(r"[-_.]+")
+
+
+def normalize(name):
+    """Normalize a project name as specified in PEP 503."""
+    return _NON_ALPHANUMERIC.sub("-", name).lower()
+
+
+class ProjectNotFound(LookupError):
+    """Raised by backends for a project that the index or mirror does not have."""
+
+
+class Backend:
+    """Source of project listings.
+
+    Subclasses implement `chunks`; `iter_uploads` parses its output
+    incrementally with `iter_files`.
+    """
+
+    def chunks(self, package, stats=None):
+        """Yield the PEP 691 JSON listing of `package` in blocks of bytes.
+
+        Raises `ProjectNotFound` if there is no listing of `package`. Backends
+        that download listings record in `stats`, if given, the bytes
+        downloaded (``"network_bytes"``) and whether the listing was served
+        from their cache (``"cached"``).
+        """
+        raise NotImplementedError
+
+    def iter_uploads(self, package, fields=UPLOAD_FIELDS):
+        """Stream the ``(filename, upload-time)`` pairs of a project's files.
+
+        Parameters
+        ----------
+        package : str
+            Name of the project.
+        fields : tuple of str
+            Keys of the file entries to yield. Missing keys give None, e.g.
+            for the optional ``"requires-python"``.
+
+        Yields
+        ------
+        tuple of str
+            The file name and upload time of each file, or its `fields`.
+
+        """
+        for f in iter_files(self.chunks(package)):
+            yield tuple(map(f.get, fields))
+
+
+class HTTPBackend(Backend):
+    """Query a simple index over HTTP.
+
+    Requests go through a single `requests.Session`, whose connection pool is
+    shared by all threads, and are retried on connection errors and on
+    ``429`` and ``5xx`` responses.
+
+    Parameters
+    ----------
+    index_url : str
+        Base URL of the simple index.
+    cache : ResponseCache, optional
+        Cache used to avoid downloading unchanged listings again.
+    retries : int
+        Maximum number of retries per request.
+    pool_size : int
+        Number of connections kept open to the index.
+
+    """
+
+    def __init__(
+        self, index_url=INDEX_URL, cache=None, retries=3, pool_size=MAX_WORKERS
+    ):
+        self.index_url = index_url
+        self.cache = cache
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.headers["Accept"] = SIMPLE_JSON
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __str__(self):
+        return urlparse(self.index_url).netloc
+
+    def chunks(self, package, stats=None):
+        url = f"{self.index_url}/{package}"
+        try:
+            if self.cache is not None:
+                with self.cache.open(url, session=self.session, stats=stats) as body:
+                    yield from iter(lambda: body.read(CHUNK_SIZE), b"")
+                return
+
+            with self.session.get(url, stream=True) as response:
+                response.raise_for_status()
+                _record(stats, cached=False)
+                yield from _counted(response.iter_content(CHUNK_SIZE), stats)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            raise ProjectNotFound(f"No project {package} on {self}") from e
+
+
+class MirrorBackend(Backend):
+    """Read listings saved in a local directory, such as a PyPI mirror.
+
+    The listing of a project is read from the first existing file among
+    ``<name>/index.v1_json`` (as written by bandersnatch), ``<name>/index.json``
+    and ``<name>.json``, where ``<name>`` is the normalized project name. Files
+    are memory-mapped rather than read.
+
+    Only PEP 691 JSON listings are supported: PEP 503 HTML listings do not
+    record upload times.
+
+    Parameters
+    ----------
+    path : str or Path
+        Directory holding the listings, e.g. the ``simple`` directory of a
+        mirror.
+
+    """
+
+    layouts = ["{}/index.v1_json", "{}/index.json", "{}.json"]
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __str__(self):
+        return str(self.path)
+
+    def listing_path(self, package):
+        name = normalize(package)
+        for layout in self.layouts:
+            path = self.path / layout.format(name)
+            if path.is_file():
+                return path
+        if (self.path / name / "index.html").is_file():
+            raise ValueError(
+                f"Only an HTML listing of {package} is available in {self.path}; "
+                "a PEP 691 JSON listing is needed for upload times"
+            )
+        raise ProjectNotFound(f"No listing of {package} in {self.path}")
+
+    def chunks(self, package, stats=None):
+        with open(self.listing_path(package), "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for start in range(0, len(data), CHUNK_SIZE):
+                    yield data[start : start + CHUNK_SIZE]
+
+
+class FixtureBackend(Backend):
+    """Serve listings held in memory, e.g. in tests.
+
+    Parameters
+    ----------
+    listings : dict
+        Maps project names to PEP 691 JSON documents.
+
+    """
+
+    def __init__(self, listings):
+        self.listings = listings
+
+    def __str__(self):
+        return "fixture"
+
+    def _listing(self, package):
+        if package not in self.listings:
+            raise ProjectNotFound(f"No listing of {package}")
+        return self.listings[package]
+
+    def chunks(self, package, stats=None):
+        yield json.dumps(self._listing(package)).encode()
+
+    def iter_uploads(self, package, fields=UPLOAD_FIELDS):
+        for f in self._listing(package)["files"]:
+            yield tuple(map(f.get, fields))
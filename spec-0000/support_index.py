@@ -0,0 +1,180 @@
+"""
+SPEC 0 Support Index
+====================
+
+Answer "which versions of a package does SPEC 0 recommend supporting on a
+given date?" without network access, e.g. when generating CI matrices::
+
+    index = SupportIndex.load("support-index.json")
+    index.minimum_supported("numpy", date(2025, 6, 1))
+
+An index is built from the release dates fetched by ``SPEC0_versions.py``
+(see its ``--save-index`` option), and saved as compact JSON.
+"""
+
+import json
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from packaging.version import Version
+
+from SPEC0_versions import support_time
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _seconds(when):
+    if not isinstance(when, datetime):
+        when = datetime(when.year, when.month, when.day)
+    return int((when - EPOCH).total_seconds())
+
+
+class _RangeMin:
+    """Sparse table answering "smallest item in ``items[lo:hi]``" in O(1)."""
+
+    def __init__(self, items):
+        self.levels = [list(items)]
+        width = 1
+        while 2 * width <= len(items):
+            previous = self.levels[-1]
+            self.levels.append(
+                [
+                    min(previous[i], previous[i + width])
+                    for i in range(len(previous) - width)
+                ]
+            )
+            width *= 2
+
+    def __call__(self, lo, hi):
+        level = (hi - lo).bit_length() - 1
+        row = self.levels[level]
+        return min(row[lo], row[hi - (1 << level)])
+
+
+class SupportIndex:
+    """Interval index of the support windows of package releases.
+
+    For each package, releases are sorted by release date. Since all releases
+    of a package are supported for the same time, drop dates are sorted too,
+    so the releases supported at any date form a contiguous run, found with two
+    binary searches.
+
+    Parameters
+    ----------
+    releases : dict
+        Maps each package to a list of ``(version, release, drop)`` tuples,
+        with release and drop dates as `datetime`.
+
+    """
+
+    def __init__(self, releases):
+        self._packages = {}
+        for package, rows in releases.items():
+            rows = sorted(rows, key=lambda row: (row[1], row[2]))
+            versions = [str(version) for version, _, _ in rows]
+            released = [_seconds(release) for _, release, _ in rows]
+            dropped = [_seconds(drop) for _, _, drop in rows]
+            if dropped != sorted(dropped):
+                raise ValueError(
+                    f"Drop dates of {package} are not in the order of release dates"
+                )
+            ranks = sorted(range(len(versions)), key=lambda i: Version(versions[i]))
+            order = [0] * len(versions)
+            for rank, i in enumerate(ranks):
+                order[i] = rank
+            self._packages[package] = (
+                versions,
+                released,
+                dropped,
+                _RangeMin([(order[i], i) for i in range(len(versions))]),
+            )
+
+    @classmethod
+    def from_release_dates(cls, release_dates):
+        """Build an index from ``{package: {version: release date}}``."""
+        return cls(
+            {
+                package: [
+                    (version, release, release + support_time(package))
+                    for version, release in dates.items()
+                ]
+                for package, dates in release_dates.items()
+            }
+        )
+
+    def packages(self):
+        return list(self._packages)
+
+    def _supported(self, package, when):
+        _, released, dropped, _ = self._packages[package]
+        t = _seconds(when)
+        return bisect_right(dropped, t), bisect_right(released, t)
+
+    def supported_versions(self, package, when):
+        """Versions of `package` released on or before `when` and not yet dropped.
+
+        Parameters
+        ----------
+        package : str
+            Package name, e.g. ``"numpy"`` or ``"python"``.
+        when : date or datetime
+            Date of the query. A `date` stands for midnight at its start.
+
+        Returns
+        -------
+        list of str
+            Versions in order of release.
+
+        """
+        lo, hi = self._supported(package, when)
+        return self._packages[package][0][lo:hi]
+
+    def minimum_supported(self, package, when):
+        """Lowest version of `package` supported at `when`, or None.
+
+        See `supported_versions` for the parameters.
+        """
+        lo, hi = self._supported(package, when)
+        if lo >= hi:
+            return None
+        versions, _, _, range_min = self._packages[package]
+        return versions[range_min(lo, hi)[1]]
+
+    def to_json(self):
+        """Serialize the index; dates are stored as seconds since 1970."""
+        return {
+            "version": 1,
+            "packages": {
+                package: {
+                    "versions": versions,
+                    "released": released,
+                    "dropped": dropped,
+                }
+                for package, (versions, released, dropped, _) in self._packages.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        releases = {}
+        for package, columns in data["packages"].items():
+            releases[package] = [
+                (
+                    version,
+                    EPOCH + timedelta(seconds=release),
+                    EPOCH + timedelta(seconds=drop),
+                )
+                for version, release, drop in zip(
+                    columns["versions"], columns["released"], columns["dropped"]
+                )
+            ]
+        return cls(releases)
+
+    def save(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.to_json(), fh, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            return cls.from_json(json.load(fh))
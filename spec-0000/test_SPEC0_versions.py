@@ -0,0 +1,182 @@
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import SPEC0_versions
+from fake_index import FakeIndex, synthetic_index, synthetic_listing
+from simple_index import FixtureBackend, HTTPBackend, ResponseCache
+from support_index import SupportIndex
+
+TESTDATA = Path(__file__).parent / "testdata"
+
+
+def test_import_has_no_side_effects(tmp_path):
+    code = "import sys, SPEC0_versions; print(sorted({'pandas', 'requests'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={"PYTHONPATH": SPEC0_versions.__file__.rsplit("/", 1)[0]},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "[]\n"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cutoff_date():
+    # Same as the pandas quarter arithmetic previously used
+    for as_of in pd.date_range("2023-01-01", "2025-12-31", freq="17D"):
+        quarter_start = pd.Timestamp(as_of.year, (as_of.quarter - 1) * 3 + 1, 1)
+        expected = quarter_start - pd.DateOffset(months=9)
+        assert SPEC0_versions.cutoff_date(as_of.to_pydatetime()) == expected
+
+
+def test_compute_support_window():
+    release_dates = {
+        "python": SPEC0_versions.python_release_dates(),
+        "numpy": {
+            "1.0.0": datetime(2022, 1, 1),
+            "2.0.0": datetime(2023, 6, 1),
+            "3.0.0": datetime(2025, 3, 1),
+        },
+    }
+    package_releases = SPEC0_versions.compute_support_window(
+        release_dates, as_of=datetime(2025, 2, 1)
+    )
+
+    # The cutoff is 2024-04-01, and releases after as_of are not known yet
+    assert list(package_releases["python"]) == ["3.10", "3.11", "3.12", "3.13"]
+    assert package_releases["numpy"] == {
+        "2.0.0": {
+            "release_date": datetime(2023, 6, 1),
+            "drop_date": datetime(2025, 5, 31),
+        }
+    }
+
+
+def test_main(tmp_path):
+    listings = {
+        package: synthetic_listing(package, n_releases=40, start=datetime(2015, i, 4))
+        for i, package in enumerate(SPEC0_versions.core_packages, start=1)
+    }
+    argv = ["--as-of", "2025-11-01", "--output-dir", str(tmp_path)]
+
+    with FakeIndex(listings) as index:
+        SPEC0_versions.main(argv + ["--index-url", index.url, "--no-cache"])
+        output = {path.name: path.read_text() for path in tmp_path.iterdir()}
+
+        cache_dir = tmp_path / "cache"
+        SPEC0_versions.main(
+            argv + ["--index-url", index.url, "--cache-dir", str(cache_dir)]
+        )
+
+    # The index is gone, but its responses are cached
+    argv += ["--index-url", index.url, "--cache-dir", str(cache_dir)]
+    SPEC0_versions.main(
+        argv
+        + ["--offline", "--save-index", str(tmp_path / "index")]
+        + ["--backtest", "2024-01-01"]
+        + ["--package-months", "18", "24", "--cutoff-quarters", "2", "3"]
+    )
+    assert {path.name: path.read_text() for path in tmp_path.glob("*.md")} == output
+    backtest = pd.read_csv(tmp_path / "backtest.csv")
+    assert list(backtest["as_of"].unique())[-1] == "2025-10-01"
+    scenarios = pd.read_csv(tmp_path / "scenarios.csv")
+    assert list(scenarios.columns)[2:] == [
+        "18m/36m/2q",
+        "18m/36m/3q",
+        "24m/36m/2q",
+        "24m/36m/3q",
+    ]
+    index = SupportIndex.load(tmp_path / "index")
+    assert index.minimum_supported("python", datetime(2025, 11, 1)) == "3.12"
+
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    for package, listing in listings.items():
+        (mirror / f"{package}.json").write_text(json.dumps(listing))
+    output_dir = tmp_path / "from-mirror"
+    output_dir.mkdir()
+    SPEC0_versions.main(
+        ["--as-of", "2025-11-01", "--mirror", str(mirror), "--no-cache"]
+        + ["--output-dir", str(output_dir)]
+    )
+    assert {path.name: path.read_text() for path in output_dir.iterdir()} == output
+
+    assert output["schedule.md"].startswith("#### 2025 - Quarter 2:\n")
+    assert "\n| python       | 3.11   | released Oct 2022 |\n" in output["schedule.md"]
+    assert output["chart.md"].startswith("gantt\ndateFormat YYYY-MM-DD\n")
+
+
+def test_backtest_before_py_releases(tmp_path, capsys):
+    argv = ["--backtest", "2017-01-01", "--output-dir", str(tmp_path)]
+    with pytest.raises(SystemExit):
+        SPEC0_versions.main(argv + ["--mirror", str(tmp_path), "--no-cache"])
+    assert "needs the drop dates of Python releases before 3.4" in (
+        capsys.readouterr().err
+    )
+
+
+@pytest.mark.parametrize("cache", [False, True])
+def test_fetch_skips_missing_projects(tmp_path, capsys, cache):
+    listings = {"numpy": synthetic_listing("numpy", n_releases=3)}
+    with FakeIndex(listings) as index:
+        backend = HTTPBackend(
+            index.url, cache=ResponseCache(tmp_path) if cache else None
+        )
+        release_dates = SPEC0_versions.fetch(
+            ["not-on-pypi", "numpy"], backend=backend, max_workers=2
+        )
+    assert list(release_dates) == ["numpy"]
+    assert "Skipping not-on-pypi: No project not-on-pypi on " in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("engine", ["pandas", "stdlib"])
+def test_golden_output(engine):
+    # Regenerate testdata/ if the output is meant to change
+    listings = synthetic_index(10)
+    release_dates = {"python": SPEC0_versions.python_release_dates()}
+    release_dates |= SPEC0_versions.fetch(
+        list(listings),
+        backend=FixtureBackend(listings),
+        max_workers=1,
+        batched_parsing=engine == "pandas",
+    )
+    package_releases = SPEC0_versions.compute_support_window(
+        release_dates, as_of=datetime(2025, 11, 1)
+    )
+
+    output = SPEC0_versions.render(package_releases, engine)
+    assert output == {path.name: path.read_text() for path in TESTDATA.glob("*.md")}
+
+
+def test_stdlib_engine(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    for i, package in enumerate(SPEC0_versions.core_packages, start=1):
+        listing = synthetic_listing(package, n_releases=40, start=datetime(2015, i, 4))
+        (mirror / f"{package}.json").write_text(json.dumps(listing))
+
+    code = "import sys, SPEC0_versions; SPEC0_versions.main(sys.argv[1:]); print('pandas' in sys.modules)"
+    argv = ["--as-of", "2025-11-01", "--mirror", str(mirror), "--no-cache"]
+    outputs = {}
+    for engine in ["pandas", "stdlib"]:
+        output_dir = tmp_path / engine
+        output_dir.mkdir()
+        result = subprocess.run(
+            [sys.executable, "-c", code, *argv]
+            + ["--engine", engine, "--output-dir", str(output_dir)],
+            env={"PYTHONPATH": SPEC0_versions.__file__.rsplit("/", 1)[0]},
+            capture_output=True,
+            check=True,
+        )
+        assert result.stdout.splitlines()[-1] == str(engine == "pandas").encode()
+        outputs[engine] = {path.name: path.read_text() for path in output_dir.iterdir()}
+
+    assert outputs["stdlib"] == outputs["pandas"]
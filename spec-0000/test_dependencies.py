@@ -0,0 +1,165 @@
+import json
+
+import SPEC0_versions
+from dependencies import collect_packages, read_packages
+from fake_index import synthetic_listing
+from support_index import SupportIndex
+
+PYPROJECT = """
+[project]
+name = "example"
+dependencies = ["NumPy>=1.26", "scipy; python_version < '3.14'"]
+
+[project.optional-dependencies]
+plot = ["matplotlib[qt]>=3.8"]
+
+[dependency-groups]
+test = ["pytest", {include-group = "lint"}]
+lint = ["ruff"]
+"""
+
+UV_LOCK = """
+version = 1
+
+[[package]]
+name = "example"
+version = "0.1.0"
+source = { editable = "." }
+
+[[package]]
+name = "numpy"
+version = "2.3.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "mylib"
+version = "0.2.0"
+source = { directory = "../mylib" }
+
+[[package]]
+name = "private-tool"
+version = "1.0.0"
+source = { git = "https://example.com/private-tool.git?rev=main#0123abc" }
+
+[[package]]
+name = "vendored"
+version = "1.0.0"
+source = { path = "wheels/vendored-1.0.0-py3-none-any.whl" }
+
+[[package]]
+name = "scikit-image"
+version = "0.25.0"
+source = { registry = "https://pypi.org/simple" }
+"""
+
+PYLOCK = """
+lock-version = "1.0"
+created-by = "pip"
+
+[[packages]]
+name = "numpy"
+version = "2.3.0"
+
+[[packages]]
+name = "networkx"
+version = "3.5"
+
+[[packages]]
+name = "mylib"
+directory = { path = "../mylib", editable = true }
+
+[[packages]]
+name = "private-tool"
+version = "1.0.0"
+vcs = { type = "git", url = "https://example.com/private-tool.git", commit-id = "0123abc" }
+"""
+
+POETRY_LOCK = """
+[[package]]
+name = "xarray"
+version = "2025.6.0"
+
+[[package]]
+name = "mylib"
+version = "0.2.0"
+
+[package.source]
+type = "directory"
+url = "../mylib"
+"""
+
+
+def test_read_packages(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(PYPROJECT)
+    (tmp_path / "uv.lock").write_text(UV_LOCK)
+    (tmp_path / "pylock.toml").write_text(PYLOCK)
+    (tmp_path / "poetry.lock").write_text(POETRY_LOCK)
+    (tmp_path / "requirements.txt").write_text(
+        "# Pinned\n-r requirements-test.txt\nIPython==9.0  # shell\n"
+        "--index-url https://example.com/simple\n-e .\n"
+    )
+    (tmp_path / "requirements-test.txt").write_text("pytest\nnot a requirement!\n")
+
+    assert read_packages(tmp_path / "pyproject.toml") == [
+        "numpy",
+        "scipy",
+        "matplotlib",
+        "pytest",
+        "ruff",
+    ]
+    assert read_packages(tmp_path / "uv.lock") == ["numpy", "scikit-image"]
+    assert read_packages(tmp_path / "pylock.toml") == ["numpy", "networkx"]
+    assert read_packages(tmp_path / "poetry.lock") == ["xarray"]
+    assert read_packages(tmp_path / "requirements.txt") == ["pytest", "ipython"]
+
+
+def test_collect_packages(tmp_path):
+    # Two projects of a monorepo share most of their dependencies
+    for project, requirements in [
+        ("a", "numpy\nscipy\n"),
+        ("b", "Scipy\npython\nzarr"),
+    ]:
+        (tmp_path / project).mkdir()
+        (tmp_path / project / "requirements.txt").write_text(requirements)
+    paths = [tmp_path / "a" / "requirements.txt", tmp_path / "b" / "requirements.txt"]
+    assert collect_packages(paths) == ["numpy", "scipy", "zarr"]
+
+
+def test_main_packages_from(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    for package in ["numpy", "scikit-image"]:
+        listing = synthetic_listing(package, n_releases=40)
+        (mirror / f"{package}.json").write_text(json.dumps(listing))
+    (tmp_path / "uv.lock").write_text(UV_LOCK)
+
+    SPEC0_versions.main(
+        ["--as-of", "2025-11-01", "--mirror", str(mirror), "--no-cache"]
+        + ["--output-dir", str(tmp_path), "--packages-from", str(tmp_path / "uv.lock")]
+        + ["--save-index", str(tmp_path / "index")]
+    )
+    chart = (tmp_path / "chart.md").read_text()
+    sections = [line for line in chart.splitlines() if line.startswith("section")]
+    assert sections == ["section python", "section numpy", "section scikit-image"]
+    index = SupportIndex.load(tmp_path / "index")
+    assert sorted(index.packages()) == ["numpy", "python", "scikit-image"]
+
+
+def test_main_packages_from_missing(tmp_path, capsys):
+    # Packages that the mirror does not have are skipped
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    listing = synthetic_listing("numpy", n_releases=40)
+    (mirror / "numpy.json").write_text(json.dumps(listing))
+    (tmp_path / "uv.lock").write_text(UV_LOCK)
+
+    SPEC0_versions.main(
+        ["--as-of", "2025-11-01", "--mirror", str(mirror), "--no-cache"]
+        + ["--output-dir", str(tmp_path), "--packages-from", str(tmp_path / "uv.lock")]
+    )
+    assert "Skipping scikit-image: No listing of scikit-image" in (
+        capsys.readouterr().out
+    )
+    chart = (tmp_path / "chart.md").read_text()
+    sections = [line for line in chart.splitlines() if line.startswith("section")]
+    assert sections == ["section python", "section numpy"]
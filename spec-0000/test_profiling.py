@@ -0,0 +1,110 @@
+import json
+
+import SPEC0_versions
+from fake_index import FakeIndex, synthetic_listing
+from profiling import Profile
+from simple_index import HTTPBackend, ResponseCache
+
+
+def test_spans():
+    profile = Profile()
+    with profile.span("outer", files=1) as args:
+        with profile.span("inner", "fetch"):
+            pass
+        args["files"] += 1
+
+    spans = profile.to_json()["spans"]
+    assert [span["name"] for span in spans] == ["outer", "inner"]
+    assert spans[0]["args"] == {"files": 2}
+    assert spans[1]["category"] == "fetch"
+    assert spans[0]["duration"] >= spans[1]["duration"] >= 0
+
+    events = profile.to_chrome_trace()["traceEvents"]
+    assert [(e["name"], e["ph"], e["tid"]) for e in events] == [
+        ("outer", "X", 0),
+        ("inner", "X", 0),
+    ]
+
+
+def test_fetch_profile():
+    listings = {
+        "numpy": synthetic_listing("numpy", n_releases=3),
+        "scipy": synthetic_listing("scipy", n_releases=5),
+    }
+    size = {package: len(json.dumps(listing)) for package, listing in listings.items()}
+    profile = Profile()
+    with FakeIndex(listings, latency=0.05) as index:
+        SPEC0_versions.fetch(
+            list(listings), backend=HTTPBackend(index.url), profile=profile
+        )
+
+    spans = {span["name"]: span for span in profile.spans}
+    assert spans["scipy"]["category"] == "fetch"
+    assert spans["scipy"]["args"]["listing_bytes"] == size["scipy"]
+    # Each release has an sdist, whose version cannot be parsed, and 4 wheels
+    assert spans["scipy"]["args"]["files"] == 5 * 2 * 5
+    assert spans["scipy"]["args"]["invalid_versions"] == 5 * 2
+    assert spans["scipy"]["args"]["invalid_dates"] == 0
+    assert spans["numpy"]["args"]["fetch_seconds"] >= 0.05
+    assert spans["scipy"]["args"]["network_bytes"] == size["scipy"]
+    assert not spans["scipy"]["args"]["cached"]
+
+
+def test_fetch_profile_cache(tmp_path):
+    listings = {"numpy": synthetic_listing("numpy", n_releases=3)}
+    size = len(json.dumps(listings["numpy"]))
+    with FakeIndex(listings) as index:
+        profiles = []
+        for ttl in [0, 0, 3600]:  # downloaded, 304 Not Modified, fresh
+            profile = Profile()
+            backend = HTTPBackend(index.url, cache=ResponseCache(tmp_path, ttl=ttl))
+            SPEC0_versions.fetch(["numpy"], backend=backend, profile=profile)
+            profiles.append(profile.spans[0]["args"])
+        assert index.not_modified == 1
+
+    # Cached listings are parsed, but not downloaded
+    assert [args["listing_bytes"] for args in profiles] == [size] * 3
+    assert [args["network_bytes"] for args in profiles] == [size, 0, 0]
+    assert [args["cached"] for args in profiles] == [False, True, True]
+
+
+def test_main_profile(tmp_path):
+    listings = {
+        package: synthetic_listing(package, n_releases=40)
+        for package in SPEC0_versions.core_packages
+    }
+    # The first wheel of 1.0.0
+    listings["numpy"]["files"][1]["upload-time"] = "yesterday"
+    argv = ["--as-of", "2025-11-01", "--no-cache", "--output-dir", str(tmp_path)]
+
+    for engine in ["pandas", "stdlib"]:
+        SPEC0_versions.main(
+            argv
+            + ["--mirror", str(mirror(tmp_path, listings)), "--engine", engine]
+            + ["--profile", str(tmp_path / f"{engine}.json")]
+        )
+        spans = json.loads((tmp_path / f"{engine}.json").read_text())["spans"]
+        names = [span["name"] for span in spans]
+        assert names[0] == "fetch" and names[-2:] == ["filter", "render"]
+        assert set(names[1:-2]) == set(SPEC0_versions.core_packages)
+        numpy = spans[names.index("numpy")]["args"]
+        assert numpy["invalid_dates"] == 1
+        # Mirrors are not downloaded from
+        assert numpy["network_bytes"] == 0 and numpy["listing_bytes"] > 0
+
+    SPEC0_versions.main(
+        argv
+        + ["--mirror", str(tmp_path / "mirror")]
+        + ["--profile", str(tmp_path / "trace.json"), "--profile-format", "chrome"]
+    )
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert {event["ph"] for event in trace["traceEvents"]} == {"X"}
+    assert trace["traceEvents"][0]["name"] == "fetch"
+
+
+def mirror(tmp_path, listings):
+    path = tmp_path / "mirror"
+    path.mkdir(exist_ok=True)
+    for package, listing in listings.items():
+        (path / f"{package}.json").write_text(json.dumps(listing))
+    return path
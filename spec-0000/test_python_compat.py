@@ -0,0 +1,107 @@
+import json
+from datetime import datetime
+
+from packaging.version import Version
+
+import SPEC0_versions
+from fake_index import synthetic_listing
+from python_compat import (
+    ci_matrix,
+    compatibility_matrix,
+    compatible_pythons,
+    record_requires_python,
+    specifier_set,
+)
+from simple_index import FixtureBackend
+
+PYTHONS = ("3.9", "3.10", "3.11", "3.12")
+
+
+def test_compatible_pythons():
+    assert compatible_pythons(">=3.10", PYTHONS) == ("3.10", "3.11", "3.12")
+    assert compatible_pythons(">=3.9.1,<3.12.0", PYTHONS) == ("3.9", "3.10", "3.11")
+    assert compatible_pythons("!=3.10.*, >=3.9", PYTHONS) == ("3.9", "3.11", "3.12")
+    assert compatible_pythons(">=3.13", PYTHONS) == ()
+    # Missing or broken metadata does not restrict anything
+    for spec in [None, "", ">=3.6'"]:
+        assert compatible_pythons(spec, PYTHONS) == PYTHONS
+
+
+def test_specifiers_are_cached():
+    specifier_set.cache_clear()
+    compatible_pythons.cache_clear()
+    for _ in range(1000):
+        compatible_pythons(">=3.8", PYTHONS)
+        compatible_pythons(">=3.8", PYTHONS[1:])
+    assert specifier_set.cache_info().misses == 1
+    assert compatible_pythons.cache_info().misses == 2
+
+
+def test_record_requires_python():
+    files = [
+        ("pkg-1.0.0.tar.gz", "2020-01-02T00:00:00Z", None),
+        ("pkg-1.0.0-py3-none-any.whl", "2020-01-01T00:00:00Z", ">=3.8"),
+        ("pkg-1.0-py3-none-any.whl", "2020-01-01T00:00:00Z", ">=3.9"),
+        ("pkg-1.1.0-py3-none-any.whl", "2020-06-01T00:00:00Z", ">=3.9"),
+        ("pkg_broken.tar.gz", "2020-06-01T00:00:00Z", ">=3.9"),
+    ]
+    requires_python = {}
+    pairs = record_requires_python(iter(files), requires_python)
+    assert list(pairs) == [f[:2] for f in files]
+    assert requires_python == {Version("1.0.0"): ">=3.8", Version("1.1.0"): ">=3.9"}
+
+
+def test_compatibility_matrix():
+    listings = {"numpy": synthetic_listing("numpy", n_releases=40)}
+    requires_python = {}
+    release_dates = {"python": SPEC0_versions.python_release_dates()}
+    release_dates |= SPEC0_versions.fetch(
+        ["numpy"], backend=FixtureBackend(listings), requires_python=requires_python
+    )
+    as_of = datetime(2025, 11, 1)
+    package_releases = SPEC0_versions.compute_support_window(release_dates, as_of)
+    # Python 3.11 and numpy 1.29.0 to 1.31.0 were dropped recently
+    assert list(package_releases["python"]) == ["3.11", "3.12", "3.13", "3.14"]
+    pythons = ["3.12", "3.13", "3.14"]
+
+    # Release 1.i.0 of the synthetic listing requires Python >= 3.(5 + i // 5)
+    matrix = compatibility_matrix(package_releases, requires_python, as_of)
+    assert list(matrix) == ["numpy"]
+    assert {str(v): p for v, p in matrix["numpy"].items()} == {
+        f"1.{i}.0": [p for p in pythons if int(p[2:]) >= 5 + i // 5]
+        for i in range(32, 40)
+    }
+    assert matrix["numpy"][Version("1.39.0")] == pythons
+
+    include = ci_matrix(matrix)["include"]
+    assert include[0] == {
+        "package": "numpy",
+        "version": "1.32.0",
+        "python-version": "3.12",
+    }
+    assert len(include) == 8 * 3
+    json.dumps(include)
+
+
+def test_main_ci_matrix(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    for package in SPEC0_versions.core_packages:
+        listing = synthetic_listing(package, n_releases=40)
+        (mirror / f"{package}.json").write_text(json.dumps(listing))
+
+    SPEC0_versions.main(
+        ["--as-of", "2025-11-01", "--mirror", str(mirror), "--no-cache"]
+        + ["--output-dir", str(tmp_path), "--ci-matrix", str(tmp_path / "ci.json")]
+    )
+    include = json.loads((tmp_path / "ci.json").read_text())["include"]
+    assert {entry["package"] for entry in include} == set(SPEC0_versions.core_packages)
+    assert {"package": "zarr", "version": "1.39.0", "python-version": "3.12"} in include
+    # Nothing dropped by the --as-of date
+    assert "3.11" not in {entry["python-version"] for entry in include}
+    assert "1.31.0" not in {entry["version"] for entry in include}
+    assert {
+        "package": "zarr",
+        "version": "1.39.0",
+        "python-version": "3.11",
+    } not in include
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from packaging.version import Version
+
+from fake_index import synthetic_listing
+from release_dates import parse_release_dates, parse_release_dates_batched
+
+
+def uploads(listing):
+    return [(f["filename"], f["upload-time"]) for f in listing["files"]]
+
+
+@pytest.mark.parametrize("parse", [parse_release_dates, parse_release_dates_batched])
+def test_release_dates(parse):
+    files = [
+        ("pkg-1.0.0.tar.gz", "2020-01-02T00:00:00Z"),
+        ("pkg-1.0.0-py3-none-any.whl", "2020-01-01T12:00:00.5Z"),
+        ("pkg-1.0-py3-none-any.whl", "2020-01-01T06:00:00Z"),
+        ("pkg-1.0.1-py3-none-any.whl", "2019-12-01T00:00:00Z"),
+        ("pkg-1.1.0rc1-py3-none-any.whl", "2019-12-01T00:00:00Z"),
+        ("pkg-1.1.0-py3-none-any.whl", "2020-06-01T00:00:00Z"),
+        ("pkg-1.2.0-py3-none-any.whl", "yesterday"),
+        ("pkg-not.a.version-py3-none-any.whl", "2020-06-01T00:00:00Z"),
+    ]
+    assert parse("pkg", files) == {
+        Version("1.0.0"): datetime(2020, 1, 1, 6),
+        Version("1.1.0"): datetime(2020, 6, 1),
+    }
+
+
+def test_batched_matches_scalar(capsys):
+    files = uploads(synthetic_listing("numpy", n_releases=30))
+    expected = parse_release_dates("numpy", files)
+    capsys.readouterr()
+
+    assert parse_release_dates_batched("numpy", iter(files)) == expected
+    out = capsys.readouterr().out.splitlines()
+    assert out == [
+        "Error: 60 files of 'numpy' have an invalid version, e.g. '1.0.0.tar.gz'"
+    ]
+
+    assert parse_release_dates_batched("numpy", []) == {}
+
+
+def test_batched_counts_missing_versions_once(capsys):
+    files = [(name, "2020-01-01T00:00:00Z") for name in ["a", "b.tar.gz", "c.whl"]]
+    files.append(("pkg-1.0.0-py3-none-any.whl", "2020-01-01T00:00:00Z"))
+    stats = {}
+    assert parse_release_dates_batched("pkg", files, stats) == {
+        Version("1.0.0"): datetime(2020, 1, 1)
+    }
+    assert stats["invalid_versions"] == 3
+    assert capsys.readouterr().out == (
+        "Error: 3 files of 'pkg' have an invalid version\n"
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100])
+def test_batched_chunks(monkeypatch, chunk_size):
+    files = uploads(synthetic_listing("numpy", n_releases=30))
+    expected_stats = {}
+    expected = parse_release_dates("numpy", files, expected_stats)
+
+    consumed = 0
+
+    def stream():
+        nonlocal consumed
+        for file in files:
+            consumed += 1
+            yield file
+
+    # Record how many files were read when each batch is converted
+    read = []
+    to_datetime = pd.to_datetime
+
+    def recording_to_datetime(*args, **kwargs):
+        read.append(consumed)
+        return to_datetime(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "to_datetime", recording_to_datetime)
+
+    stats = {}
+    result = parse_release_dates_batched("numpy", stream(), stats, chunk_size)
+    assert result == expected
+    assert stats == expected_stats
+    n = len(files)
+    assert read == [min(k, n) for k in range(chunk_size, n + chunk_size, chunk_size)]
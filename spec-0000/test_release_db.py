@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from packaging.version import Version
+
+from release_db import ReleaseDB
+
+
+def test_merge_keeps_earliest_date(tmp_path):
+    db = ReleaseDB(tmp_path / "releases.sqlite")
+    files = [
+        ("numpy-2.0.0-cp312.whl", "2024-06-16T18:00:00.000Z"),
+        ("numpy-2.1.0-cp312.whl", "2024-08-18T12:00:00Z"),
+    ]
+    assert list(db.new_files("numpy", files)) == files
+    db.merge(
+        "numpy",
+        {
+            Version("2.0.0"): datetime(2024, 6, 16, 18),
+            Version("2.1.0"): datetime(2024, 8, 18, 12),
+        },
+    )
+    db.merge("numpy", {Version("2.0.0"): datetime(2024, 6, 17)})
+
+    assert db.packages() == ["numpy"]
+    assert db.last_upload("numpy") == "2024-08-18T12:00:00Z"
+    assert db.release_dates("numpy") == {
+        Version("2.0.0"): datetime(2024, 6, 16, 18),
+        Version("2.1.0"): datetime(2024, 8, 18, 12),
+    }
+
+
+def test_new_files_since_last_merge(tmp_path):
+    path = tmp_path / "releases.sqlite"
+    files = [
+        ("scipy-1.13.0-cp312.whl", "2024-04-02T20:00:00.500Z"),
+        ("scipy-1.14.0-cp312.whl", "2024-06-24T09:00:00.250Z"),
+    ]
+
+    db = ReleaseDB(path)
+    assert list(db.new_files("scipy", files[:1])) == files[:1]
+    db.merge("scipy", {Version("1.13.0"): datetime(2024, 4, 2, 20)})
+    db.close()
+
+    # The database persists between runs
+    db = ReleaseDB(path)
+    assert db.last_upload("scipy") == files[0][1]
+    new = ("scipy-1.14.0-cp313.whl", "2024-06-24T09:00:00Z")
+    assert list(db.new_files("scipy", files + [new])) == files + [new]
+    db.merge("scipy", {Version("1.14.0"): datetime(2024, 6, 24, 9)})
+
+    # Files from the same second as the last merge are merged again
+    assert list(db.new_files("scipy", files + [new])) == files[1:] + [new]
+    assert list(db.new_files("zarr", files)) == files
+    assert set(db.release_dates("scipy")) == {Version("1.13.0"), Version("1.14.0")}
+
+
+def test_sources_are_separate(tmp_path):
+    path = tmp_path / "releases.sqlite"
+    files = [("numpy-2.0.0-cp312.whl", "2024-06-16T18:00:00Z")]
+
+    pypi = ReleaseDB(path, source="https://pypi.org/simple/")
+    assert list(pypi.new_files("numpy", files)) == files
+    pypi.merge("numpy", {Version("2.0.0"): datetime(2024, 6, 16, 18)})
+
+    # A mirror with fewer files does not see the dates of pypi.org
+    mirror = ReleaseDB(path, source="/srv/mirror")
+    assert mirror.last_upload("numpy") is None
+    assert mirror.packages() == []
+    assert list(mirror.new_files("numpy", files)) == files
+    mirror.merge("numpy", {Version("1.26.0"): datetime(2023, 9, 16)})
+    assert mirror.release_dates("numpy") == {Version("1.26.0"): datetime(2023, 9, 16)}
+    assert pypi.release_dates("numpy") == {Version("2.0.0"): datetime(2024, 6, 16, 18)}
+
+
+def test_equal_versions_share_a_row(tmp_path):
+    db = ReleaseDB(tmp_path / "releases.sqlite")
+    db.merge("numpy", {Version("1.0.0"): datetime(2020, 1, 2)})
+    db.merge("numpy", {Version("1.0"): datetime(2020, 1, 1)})
+    db.merge("numpy", {Version("1.0.0"): datetime(2020, 1, 3)})
+
+    dates = db.release_dates("numpy")
+    assert dates == {Version("1.0.0"): datetime(2020, 1, 1)}
+    assert [str(version) for version in dates] == ["1.0.0"]
+
+
+def test_new_files_without_upload_time(tmp_path):
+    db = ReleaseDB(tmp_path / "releases.sqlite")
+    files = [
+        ("numpy-2.0.0-cp312.whl", None),
+        ("numpy-2.0.0-cp313.whl", "2024-06-16T18:00:00Z"),
+    ]
+    assert list(db.new_files("numpy", files)) == files[1:]
+    db.merge("numpy", {Version("2.0.0"): datetime(2024, 6, 16, 18)})
+    assert db.last_upload("numpy") == files[1][1]
+    assert list(db.new_files("numpy", files)) == files[1:]
+
+    assert list(db.new_files("scipy", files[:1])) == []
+    db.merge("scipy", {})
+    assert db.last_upload("scipy") is None
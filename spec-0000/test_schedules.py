@@ -0,0 +1,146 @@
+from datetime import datetime
+
+import pandas as pd
+
+from SPEC0_versions import compute_support_window, cutoff_date, python_release_dates
+from fake_index import synthetic_index
+from release_dates import parse_release_dates
+from schedules import (
+    compare_scenarios,
+    cutoff_dates,
+    drop_schedules,
+    quarterly,
+    scenario_grid,
+    sweep,
+)
+
+
+def release_dates(n_packages):
+    dates = {"python": python_release_dates()}
+    for package, listing in synthetic_index(n_packages).items():
+        files = [(f["filename"], f["upload-time"]) for f in listing["files"]]
+        dates[package] = parse_release_dates(package, files)
+    return dates
+
+
+def expected_schedule(release_dates, as_of):
+    # Rows of schedule.md, computed for a single date
+    groups = {}
+    package_releases = compute_support_window(release_dates, as_of=as_of)
+    for package, releases in package_releases.items():
+        for version, dates in releases.items():
+            quarter = pd.Timestamp(dates["drop_date"]).to_period("Q")
+            groups.setdefault((quarter, package), []).append(
+                (version, dates["release_date"])
+            )
+    first = min(quarter for quarter, _ in groups)
+    return sorted(
+        (
+            quarter,
+            package,
+            min(v for v, _ in rows),
+            max(v for v, _ in rows),
+            min(r for _, r in rows),
+            max(r for _, r in rows),
+        )
+        for (quarter, package), rows in groups.items()
+        if quarter != first
+    )
+
+
+def test_cutoff_dates():
+    as_of = pd.date_range("2019-01-01", "2025-12-31", freq="11D")
+    expected = [cutoff_date(when.to_pydatetime()) for when in as_of]
+    assert list(cutoff_dates(as_of)) == expected
+
+
+def test_drop_schedules(capsys):
+    dates = release_dates(4)
+    capsys.readouterr()
+    as_of = quarterly("2019-02-14", datetime(2025, 11, 1))
+    assert as_of[0] == pd.Timestamp("2019-01-01")
+    assert as_of[-1] == pd.Timestamp("2025-10-01")
+
+    schedules = drop_schedules(dates, as_of)
+    assert list(schedules["as_of"].unique()) == list(as_of)
+
+    for when, schedule in schedules.groupby("as_of"):
+        rows = sorted(schedule.drop(columns="as_of").itertuples(index=False, name=None))
+        assert rows == expected_schedule(dates, when.to_pydatetime())
+
+
+def test_scenario_grid():
+    grid = scenario_grid([18, 24], [36], [2, 3])
+    assert [s["name"] for s in grid] == [
+        "18m/36m/2q",
+        "18m/36m/3q",
+        "24m/36m/2q",
+        "24m/36m/3q",
+    ]
+
+
+def test_sweep_default_scenario_matches_script(capsys):
+    dates = release_dates(4)
+    as_of = datetime(2025, 11, 1)
+
+    df = sweep(dates, scenario_grid(), as_of)
+    package_releases = compute_support_window(dates, as_of=as_of)
+    expected = sorted(
+        (package, str(version), info["drop_date"])
+        for package, releases in package_releases.items()
+        for version, info in releases.items()
+    )
+    got = sorted(zip(df["package"], df["version"].map(str), df["drop"]))
+    assert got == expected
+
+
+def test_compare_scenarios(capsys):
+    dates = {
+        "python": {"3.12": datetime(2023, 10, 2)},
+        "numpy": {"1.26.0": datetime(2023, 9, 16), "2.0.0": datetime(2024, 6, 16)},
+        "scipy": {"1.10.0": datetime(2023, 1, 3), "1.11.0": datetime(2023, 6, 25)},
+    }
+    scenarios = scenario_grid([18, 24], [36], [3]) + [
+        {
+            "name": "numpy-30m",
+            "package_months": 24,
+            "python_months": 30,
+            "cutoff_quarters": 0,
+            "overrides": {"numpy": 30},
+        }
+    ]
+
+    table = compare_scenarios(dates, scenarios, datetime(2025, 5, 1))
+    assert list(table.columns) == ["18m/36m/3q", "24m/36m/3q", "numpy-30m"]
+    assert [(p, str(v)) for p, v in table.index] == [
+        ("python", "3.12"),
+        ("numpy", "1.26.0"),
+        ("numpy", "2.0.0"),
+        ("scipy", "1.10.0"),
+        ("scipy", "1.11.0"),
+    ]
+    assert table.loc[("python", "3.12")].tolist() == ["2026Q4", "2026Q4", "2026Q2"]
+    assert table.loc[("numpy", "1.26.0")].tolist() == ["2025Q1", "2025Q3", "2026Q1"]
+    assert table.loc[("numpy", "2.0.0")].tolist() == ["2025Q4", "2026Q2", "2026Q4"]
+    # Dropped before the cutoff (2024-07-01, or 2025-04-01 for the last scenario)
+    assert table.loc[("scipy", "1.10.0")].fillna("").tolist() == [
+        "2024Q3",
+        "2025Q1",
+        "",
+    ]
+    assert table.loc[("scipy", "1.11.0")].tolist() == ["2024Q4", "2025Q2", "2025Q2"]
+
+
+def test_drop_schedules_only_use_past_releases():
+    dates = {"python": python_release_dates()}
+    schedules = drop_schedules(dates, quarterly("2019-01-01", "2021-12-31"))
+    assert (schedules["last_release"] <= schedules["as_of"]).all()
+
+    first = schedules[schedules["as_of"] == pd.Timestamp("2019-01-01")]
+    assert list(zip(first["min_version"], first["max_version"])) == [
+        ("3.6", "3.6"),
+        ("3.7", "3.7"),
+    ]
+
+    table = sweep(dates, scenario_grid(), datetime(2019, 1, 1))
+    assert list(table["version"]) == ["3.5", "3.6", "3.7"]
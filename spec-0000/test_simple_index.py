@@ -0,0 +1,233 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from fake_index import FakeIndex, synthetic_listing
+from simple_index import (
+    Backend,
+    FixtureBackend,
+    HTTPBackend,
+    MirrorBackend,
+    ProjectNotFound,
+    ResponseCache,
+    fetch_all,
+    iter_files,
+)
+
+
+def uploads(listing):
+    return [(f["filename"], f["upload-time"]) for f in listing["files"]]
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_fetch_all_order_is_deterministic(max_workers):
+    packages = ["zarr", "numpy", "scipy", "numpy", "ipython"]
+    listings = {
+        package: synthetic_listing(package, n_releases=2) for package in packages
+    }
+
+    with FakeIndex(listings) as index:
+        backend = HTTPBackend(index.url)
+        result = fetch_all(
+            packages,
+            lambda package: list(backend.iter_uploads(package)),
+            max_workers=max_workers,
+        )
+
+    assert list(result) == ["zarr", "numpy", "scipy", "ipython"]
+    assert all(result[package] == uploads(listings[package]) for package in result)
+    assert len(index.requests) == 4
+
+
+def test_fetch_all_bounded_concurrency():
+    lock = threading.Lock()
+    running = peak = 0
+    barrier = threading.Barrier(3)
+
+    def fetch(package):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        barrier.wait(timeout=5)
+        with lock:
+            running -= 1
+        return package.upper()
+
+    result = fetch_all([f"p{i}" for i in range(9)], fetch, max_workers=3)
+
+    assert peak == 3
+    assert list(result.values()) == [f"P{i}" for i in range(9)]
+
+
+def cached_backend(index, path, **options):
+    return HTTPBackend(index.url, cache=ResponseCache(path, **options))
+
+
+def test_cache_conditional_requests(tmp_path):
+    listings = {"numpy": synthetic_listing("numpy", n_releases=3)}
+
+    with FakeIndex(listings) as index:
+        backend = cached_backend(index, tmp_path)
+        for _ in range(3):
+            assert list(backend.iter_uploads("numpy")) == uploads(listings["numpy"])
+        assert len(index.requests) == 3
+        assert index.not_modified == 2
+
+        # A new release invalidates the cached listing
+        listings["numpy"] = synthetic_listing("numpy", n_releases=4)
+        assert list(backend.iter_uploads("numpy")) == uploads(listings["numpy"])
+        assert index.not_modified == 2
+
+
+def test_cache_ttl_and_offline(tmp_path):
+    listings = {"numpy": synthetic_listing("numpy", n_releases=3)}
+
+    with FakeIndex(listings) as index:
+        for _ in range(2):
+            list(cached_backend(index, tmp_path, ttl=3600).iter_uploads("numpy"))
+        assert len(index.requests) == 1
+
+        offline = cached_backend(index, tmp_path, offline=True)
+        assert list(offline.iter_uploads("numpy")) == uploads(listings["numpy"])
+        with pytest.raises(FileNotFoundError, match="offline"):
+            list(offline.iter_uploads("scipy"))
+        assert len(index.requests) == 1
+
+
+def test_cache_eviction(tmp_path, monkeypatch):
+    packages = ["numpy", "scipy", "zarr", "pandas"]
+    listings = {
+        package: synthetic_listing(package, n_releases=3) for package in packages
+    }
+    size = max(len(json.dumps(listing).encode()) for listing in listings.values())
+
+    # The cache directory is only listed once, for the entries already there
+    globs = []
+    glob = type(tmp_path).glob
+    monkeypatch.setattr(
+        type(tmp_path),
+        "glob",
+        lambda self, *args: globs.append(self) or glob(self, *args),
+    )
+
+    with FakeIndex(listings) as index:
+        list(cached_backend(index, tmp_path).iter_uploads("numpy"))
+        time.sleep(0.01)
+        backend = cached_backend(index, tmp_path, max_size=2 * size)
+        for package in packages[1:]:
+            list(backend.iter_uploads(package))
+            time.sleep(0.01)
+
+    assert len(globs) == 2  # once per cache
+    monkeypatch.undo()
+    assert len(list(tmp_path.glob("*.body"))) == 2
+    offline = cached_backend(index, tmp_path, offline=True)
+    for package in ["numpy", "scipy"]:
+        with pytest.raises(FileNotFoundError):
+            list(offline.iter_uploads(package))
+    assert list(offline.iter_uploads("pandas")) == uploads(listings["pandas"])
+
+
+def test_iter_files_block_boundaries():
+    listing = synthetic_listing("numpy", n_releases=3)
+    listing["versions"] = ["1.0.0", "1.1.0"]
+    listing["files"][0]["filename"] = "numpy-1.0.0-π.tar.gz"
+    listing["files"][0]["size"] = 123456789
+    document = json.dumps(listing, indent=1, ensure_ascii=False).encode()
+
+    for size in [1, 2, 7, 4096]:
+        chunks = [document[i : i + size] for i in range(0, len(document), size)]
+        assert list(iter_files(chunks)) == listing["files"]
+
+
+def test_iter_files_edge_cases():
+    assert list(iter_files([b'{"files": [], "name": "x"}'])) == []
+    assert list(iter_files([b"{}"])) == []
+    with pytest.raises(ValueError):
+        list(iter_files([b'{"files": [{"filename": "x"}']))
+    with pytest.raises(ValueError):
+        list(iter_files([b'{"files": [{"filename": "x"} {}]}']))
+
+
+def test_http_backend(tmp_path):
+    listings = {"numpy": synthetic_listing("numpy", n_releases=3)}
+
+    with FakeIndex(listings) as index:
+        backend = HTTPBackend(index.url)
+        assert str(backend) == index.url.split("/")[2]
+        assert list(backend.iter_uploads("numpy")) == uploads(listings["numpy"])
+
+        backend = HTTPBackend(index.url, cache=ResponseCache(tmp_path))
+        for _ in range(2):
+            assert list(backend.iter_uploads("numpy")) == uploads(listings["numpy"])
+        assert index.not_modified == 1
+
+
+def test_http_backend_retries():
+    listings = {"numpy": synthetic_listing("numpy", n_releases=3)}
+
+    with FakeIndex(listings, failures=1) as index:
+        backend = HTTPBackend(index.url, retries=1)
+        assert list(backend.iter_uploads("numpy")) == uploads(listings["numpy"])
+        assert len(index.requests) == 2
+
+    with FakeIndex(listings, failures=1) as index:
+        backend = HTTPBackend(index.url, retries=0)
+        with pytest.raises(requests.RequestException):
+            list(backend.iter_uploads("numpy"))
+
+
+def test_mirror_backend(tmp_path):
+    listings = {
+        name: synthetic_listing(name, n_releases=3)
+        for name in ["numpy", "scikit-image", "zarr"]
+    }
+    (tmp_path / "numpy").mkdir()
+    (tmp_path / "numpy" / "index.v1_json").write_text(json.dumps(listings["numpy"]))
+    (tmp_path / "scikit-image").mkdir()
+    (tmp_path / "scikit-image" / "index.json").write_text(
+        json.dumps(listings["scikit-image"])
+    )
+    (tmp_path / "zarr.json").write_text(json.dumps(listings["zarr"]))
+    (tmp_path / "scipy").mkdir()
+    (tmp_path / "scipy" / "index.html").write_text("<html></html>")
+
+    backend = MirrorBackend(tmp_path)
+    for name in ["numpy", "Scikit_Image", "zarr"]:
+        expected = uploads(listings[name.lower().replace("_", "-")])
+        assert list(backend.iter_uploads(name)) == expected
+
+    with pytest.raises(ValueError, match="HTML"):
+        list(backend.iter_uploads("scipy"))
+    with pytest.raises(ProjectNotFound):
+        list(backend.iter_uploads("pandas"))
+
+
+def test_fixture_backend():
+    listings = {"numpy": synthetic_listing("numpy", n_releases=3)}
+    backend = FixtureBackend(listings)
+    assert list(backend.iter_uploads("numpy")) == uploads(listings["numpy"])
+    assert list(iter_files(backend.chunks("numpy"))) == listings["numpy"]["files"]
+    with pytest.raises(ProjectNotFound):
+        list(backend.iter_uploads("scipy"))
+
+
+def test_iter_uploads_fields():
+    listings = {"numpy": synthetic_listing("numpy", n_releases=1)}
+    del listings["numpy"]["files"][0]["requires-python"]
+    backend = FixtureBackend(listings)
+    fields = ("filename", "requires-python")
+    expected = [
+        (f["filename"], f.get("requires-python")) for f in listings["numpy"]["files"]
+    ]
+    assert expected[:2] == [
+        ("numpy-1.0.0.tar.gz", None),
+        ("numpy-1.0.0-cp30-cp30-any.whl", ">=3.5"),
+    ]
+    # Both the parsing path of all backends and the in-memory shortcut
+    assert list(Backend.iter_uploads(backend, "numpy", fields)) == expected
+    assert list(backend.iter_uploads("numpy", fields)) == expected
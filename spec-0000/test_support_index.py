@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+import pytest
+
+from SPEC0_versions import compute_support_window, python_release_dates
+from support_index import SupportIndex
+
+
+@pytest.fixture
+def release_dates():
+    return {
+        "python": python_release_dates(),
+        "numpy": {
+            "1.25.0": datetime(2023, 6, 17),
+            "1.26.0": datetime(2023, 9, 16),
+            "2.0.0": datetime(2024, 6, 16),
+            # A maintenance release of an older series, released later
+            "1.24.0": datetime(2024, 7, 1),
+            "2.1.0": datetime(2024, 8, 18),
+        },
+    }
+
+
+def test_queries(release_dates):
+    index = SupportIndex.from_release_dates(release_dates)
+
+    assert index.supported_versions("numpy", date(2023, 1, 1)) == []
+    assert index.minimum_supported("numpy", date(2023, 1, 1)) is None
+    assert index.supported_versions("numpy", datetime(2023, 6, 17)) == ["1.25.0"]
+    assert index.supported_versions("numpy", date(2024, 7, 2)) == [
+        "1.25.0",
+        "1.26.0",
+        "2.0.0",
+        "1.24.0",
+    ]
+    assert index.minimum_supported("numpy", date(2024, 7, 2)) == "1.24.0"
+    assert index.minimum_supported("numpy", date(2025, 9, 1)) == "1.24.0"
+    assert index.minimum_supported("numpy", date(2026, 7, 2)) == "2.1.0"
+    assert index.minimum_supported("python", date(2025, 6, 1)) == "3.11"
+    assert index.minimum_supported("python", date(2024, 10, 1)) == "3.10"
+
+
+def test_matches_compute_support_window(release_dates):
+    index = SupportIndex.from_release_dates(release_dates)
+
+    for when in [datetime(2024, 1, 1), datetime(2025, 6, 1), datetime(2026, 3, 1)]:
+        package_releases = compute_support_window(release_dates, as_of=when)
+        for package, releases in package_releases.items():
+            expected = [
+                str(version)
+                for version, dates in releases.items()
+                if dates["release_date"] <= when < dates["drop_date"]
+            ]
+            assert sorted(index.supported_versions(package, when)) == sorted(expected)
+
+
+def test_serialization(release_dates, tmp_path):
+    index = SupportIndex.from_release_dates(release_dates)
+    index.save(tmp_path / "index.json")
+    loaded = SupportIndex.load(tmp_path / "index.json")
+
+    assert loaded.to_json() == index.to_json()
+    assert loaded.packages() == ["python", "numpy"]
+    for day in range(1, 1000, 7):
+        when = datetime.fromordinal(date(2023, 1, 1).toordinal() + day)
+        assert loaded.supported_versions("numpy", when) == index.supported_versions(
+            "numpy", when
+        )
+        assert loaded.minimum_supported("numpy", when) == index.minimum_supported(
+            "numpy", when
+        )
+
+
+def test_unsorted_drop_dates():
+    with pytest.raises(ValueError, match="not in the order"):
+        SupportIndex(
+            {
+                "numpy": [
+                    ("1.0.0", datetime(2020, 1, 1), datetime(2023, 1, 1)),
+                    ("1.1.0", datetime(2020, 6, 1), datetime(2022, 1, 1)),
+                ]
+            }
+        )
@@ -0,0 +1,307 @@
+"""
+Benchmark the `_transition_to_rng` decorator
+============================================
+
+Times calls to a small function with and without the decorator, for each way
+of passing the PRNG, with the global `RandomState` unseeded and seeded, and
+reports the overhead of the decorator per call::
+
+    python bench_transition_to_rng.py [--number N] [--repeat R]
+
+The handling of legacy PRNGs depends on the NumPy version, so the benchmark
+can run in several environments, e.g. one virtual environment per pinned
+NumPy version, and compare the overheads with baselines saved earlier on the
+same machine::
+
+    python bench_transition_to_rng.py --python venv-*/bin/python \
+        --save-baseline baseline.json
+    python bench_transition_to_rng.py --python venv-*/bin/python \
+        --compare baseline.json
+
+Baselines are keyed by NumPy and Python version. A call form regresses if its
+overhead grows by more than ``--tolerance`` (relative) and ``--slack``
+nanoseconds, to ignore timing noise on the fastest calls; the exit status is
+then 1.
+
+Passing a `Generator` by keyword (``rng=rng``), the preferred use, takes the
+fast path of the wrapper. The ``rng_extras`` column uses the decorator of
+``rng_extras.py``: with ``--once location`` or ``--once process``, its
+warnings are only emitted once, and with ``--seed-cache SIZE``, the generators
+of integer seeds passed as ``rng=`` are cached.
+
+With ``--import-time N``, a module of N decorated functions is also
+generated and imported in a fresh interpreter, to time decoration on import,
+and the first and second access to all their signatures.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+import rng_extras
+from rng_extras import _rng_seeds, _rng_warnings
+from transition_to_rng import _transition_to_rng
+
+
+def function(arg1, rng=None, arg2=0):
+    return arg1
+
+
+decorated = {
+    "no end_version": _transition_to_rng("random_state", position_num=1)(function),
+    "end_version": _transition_to_rng(
+        "random_state", position_num=1, end_version="1.17.0"
+    )(function),
+    "rng_extras": rng_extras._transition_to_rng(
+        "random_state", position_num=1, end_version="1.17.0"
+    )(function),
+}
+
+rng = np.random.default_rng(0)
+CALLS = {
+    "rng=Generator": ((1,), {"rng": rng}),
+    "rng=int": ((1,), {"rng": 1}),
+    "rng=None": ((1,), {"rng": None}),
+    "positional Generator": ((1, rng), {}),
+    "positional int": ((1, 1), {}),
+    "positional None": ((1, None), {}),
+    "no rng": ((1,), {}),
+    "random_state=Generator": ((1,), {"random_state": rng}),
+}
+# Calls whose handling depends on whether `np.random.seed` was used
+GLOBAL_SEED_CALLS = ["positional None", "no rng"]
+
+
+@contextlib.contextmanager
+def np_random_seed(seed=0):
+    # Install a seeded global RandomState, as `np.random.seed` would
+    rs = np.random.mtrand._rand
+    np.random.mtrand._rand = np.random.RandomState(seed)
+    try:
+        yield
+    finally:
+        np.random.mtrand._rand = rs
+
+
+def best_time(func, args, kwargs, number, repeat):
+    """Best time per call, in nanoseconds."""
+    timer = timeit.Timer(lambda: func(*args, **kwargs))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def bench_call(args, kwargs, number, repeat):
+    # The undecorated function only knows the new name
+    plain = {"rng" if k == "random_state" else k: v for k, v in kwargs.items()}
+    timings = {"undecorated": best_time(function, args, plain, number, repeat)}
+    for name, func in decorated.items():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            timings[name] = best_time(func, args, kwargs, number, repeat)
+    return timings
+
+
+def bench(number=100_000, repeat=5):
+    results = {}
+    for call, (args, kwargs) in CALLS.items():
+        results[call] = bench_call(args, kwargs, number, repeat)
+    with np_random_seed():
+        for call in GLOBAL_SEED_CALLS:
+            args, kwargs = CALLS[call]
+            results[f"{call}, seeded"] = bench_call(args, kwargs, number, repeat)
+    return {
+        "numpy": np.__version__,
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def bench_in(python, argv):
+    """Run the benchmark with the interpreter `python`, and its NumPy."""
+    result = subprocess.run(
+        [python, __file__, *argv, "--json"],
+        env=os.environ | {"PYTHONPATH": str(Path(__file__).parent)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def environment(run):
+    return f"NumPy {run['numpy']}, Python {run['python']}"
+
+
+def overheads(run):
+    return {
+        (call, name): timings[name] - timings["undecorated"]
+        for call, timings in run["results"].items()
+        for name in decorated
+    }
+
+
+def compare(run, baseline, tolerance=0.2, slack=50):
+    """Call forms whose decorator overhead regressed from `baseline`.
+
+    Returns
+    -------
+    list of str
+        A description of each regression, with the old and new overheads.
+
+    """
+    old = overheads(baseline)
+    regressions = []
+    for key, overhead in overheads(run).items():
+        if key not in old:
+            continue
+        limit = max(old[key] * (1 + tolerance), old[key] + slack)
+        if overhead > limit:
+            call, name = key
+            regressions.append(
+                f"{environment(run)}: {call} ({name}): "
+                f"{old[key]:.0f} ns -> {overhead:.0f} ns"
+            )
+    return regressions
+
+
+def print_table(run):
+    print(environment(run))
+    print(f"{'call':<28}{'undecorated':>14}" + "".join(f"{n:>26}" for n in decorated))
+    for call, timings in run["results"].items():
+        baseline = timings["undecorated"]
+        line = f"{call:<28}{baseline:>11.0f} ns"
+        for name in decorated:
+            elapsed = timings[name]
+            line += f"{elapsed:>11.0f} ns (+{elapsed - baseline:>6.0f} ns)"
+        print(line)
+
+
+SYNTHETIC_FUNCTION = """
+@_transition_to_rng("random_state", position_num=1, end_version="1.17.0")
+def function_{i}(x, rng=None, *, axis: int = -1, nan_policy="propagate") -> float:
+    return x
+"""
+
+TIME_IMPORT = """
+import inspect, time
+import transition_to_rng
+
+tic = time.perf_counter()
+import synthetic
+imported = time.perf_counter()
+functions = [getattr(synthetic, name) for name in dir(synthetic) if name.startswith("function_")]
+for function in functions:
+    str(inspect.signature(function))
+first = time.perf_counter()
+for function in functions:
+    str(inspect.signature(function))
+second = time.perf_counter()
+print(imported - tic, first - imported, second - first)
+"""
+
+
+def bench_import(n_functions, repeat=5):
+    """Time importing a module of `n_functions` decorated functions."""
+    best = [float("inf")] * 3
+    with tempfile.TemporaryDirectory() as tmp:
+        source = "from transition_to_rng import _transition_to_rng\n"
+        source += "".join(SYNTHETIC_FUNCTION.format(i=i) for i in range(n_functions))
+        (Path(tmp) / "synthetic.py").write_text(source)
+        path = os.pathsep.join([tmp, str(Path(__file__).parent)])
+        # The first run also compiles the module, and is not timed
+        for i in range(repeat + 1):
+            result = subprocess.run(
+                [sys.executable, "-c", TIME_IMPORT],
+                env=os.environ | {"PYTHONPATH": path},
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            timings = map(float, result.stdout.split())
+            if i:
+                best = [min(b, t) for b, t in zip(best, timings)]
+    return dict(zip(["import", "first signature", "cached signature"], best))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--number", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--once", choices=["location", "process"])
+    parser.add_argument("--seed-cache", type=int, default=0, metavar="SIZE")
+    parser.add_argument("--import-time", type=int, metavar="N")
+    parser.add_argument(
+        "--python",
+        nargs="+",
+        metavar="EXE",
+        help="interpreters to run the benchmark with, instead of this one",
+    )
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--slack", type=float, default=50, metavar="NS")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    _rng_warnings.configure(once=args.once)
+    _rng_seeds.configure(maxsize=args.seed_cache)
+
+    if args.json:
+        print(json.dumps(bench(args.number, args.repeat)))
+        return
+
+    if args.python:
+        forwarded = ["--number", str(args.number), "--repeat", str(args.repeat)]
+        forwarded += ["--seed-cache", str(args.seed_cache)]
+        if args.once:
+            forwarded += ["--once", args.once]
+        runs = [bench_in(python, forwarded) for python in args.python]
+    else:
+        runs = [bench(args.number, args.repeat)]
+    for run in runs:
+        print_table(run)
+        print()
+
+    if args.save_baseline:
+        baselines = {}
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline) as fh:
+                baselines = json.load(fh)
+        baselines |= {environment(run): run for run in runs}
+        with open(args.save_baseline, "w") as fh:
+            json.dump(baselines, fh, indent=1)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as fh:
+            baselines = json.load(fh)
+        for run in runs:
+            if environment(run) not in baselines:
+                print(f"No baseline for {environment(run)}")
+                continue
+            baseline = baselines[environment(run)]
+            regressions += compare(run, baseline, args.tolerance, args.slack)
+        print("\n".join(regressions) or "No regressions")
+
+    if args.import_time:
+        timings = bench_import(args.import_time, args.repeat)
+        print(
+            f"{args.import_time} decorated functions: "
+            + ", ".join(f"{k} {v * 1000:.1f} ms" for k, v in timings.items())
+        )
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
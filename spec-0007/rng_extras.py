@@ -0,0 +1,377 @@
+"""
+Opt-in Features for Transitioning to ``rng``
+============================================
+
+The decorator of ``transition_to_rng.py`` is kept short, as the example of
+SPEC 7. Libraries that apply it to many functions may want more; this module
+provides:
+
+- `_transition_to_rng`, which wraps the decorator of ``transition_to_rng.py``,
+  and behaves the same unless `_rng_warnings`, `_rng_seeds` or `_rng_context`
+  are used.
+
+- `_rng_warnings`, to emit each warning only once, and report how many times
+  each call site triggered it.
+- `_rng_seeds`, to cache the initial state of the generators made from
+  integer seeds passed as `rng`.
+- `_rng_context`, to give decorated functions called without `rng` a
+  generator chosen for the current thread or asyncio task.
+- `_spawn_seeds` and `_spawn_rngs`, to derive independent streams from `rng`
+  for parallel workers, as in `parallel_function`.
+"""
+
+import atexit
+import collections
+import contextlib
+import contextvars
+import functools
+import inspect
+import sys
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import transition_to_rng
+
+
+class _RNGWarnings:
+    """Emission of the warnings of functions decorated by `_transition_to_rng`.
+
+    By default, every warning is passed to `warnings.warn`, and filtered as
+    usual. In tight loops, it can be cheaper, and less noisy, to emit each
+    distinct warning of each function only once::
+
+        _rng_warnings.configure(once="location")  # once per call site
+        _rng_warnings.configure(once="process")  # once per process
+
+    With ``report=True``, the number of times each warning was triggered by each
+    call site, including the suppressed ones, is printed to stderr at exit.
+    """
+
+    def __init__(self):
+        self.once = None
+        self._enabled = False
+        self.counts = collections.Counter()
+        self._seen = set()
+        self._report = False
+
+    def configure(self, once=None, report=False):
+        if once not in (None, "location", "process"):
+            raise ValueError("`once` must be None, 'location' or 'process'")
+        self.once = once
+        self._seen.clear()
+        if report and not self._report:
+            atexit.register(self.print_report)
+        self._report = report
+        self._enabled = once is not None or report
+
+    def warn(self, fun, message, category, stacklevel):
+        """Emit `message` on behalf of the decorated function `fun`.
+
+        `stacklevel` is counted from the caller of this method.
+        """
+        if not self._enabled:
+            warnings.warn(message, category, stacklevel=stacklevel + 1)
+            return
+        frame = sys._getframe(stacklevel)
+        location = (frame.f_code.co_filename, frame.f_lineno)
+        key = (fun.__qualname__, category.__name__, message)
+        if self._report:
+            self.counts[key[:2] + location] += 1
+        if self.once is not None:
+            seen = key + location if self.once == "location" else key
+            if seen in self._seen:
+                return
+            self._seen.add(seen)
+        warnings.warn(message, category, stacklevel=stacklevel + 1)
+
+    def print_report(self, file=None):
+        if not self.counts:
+            return
+        print("Warnings of functions transitioning to `rng`:", file=file or sys.stderr)
+        for (name, category, filename, lineno), count in self.counts.most_common():
+            print(
+                f"  {count:>8} x {category} from {name}() at {filename}:{lineno}",
+                file=file or sys.stderr,
+            )
+
+
+_rng_warnings = _RNGWarnings()
+
+
+class _CachedSeedSequence(np.random.bit_generator.ISpawnableSeedSequence):
+    # Stands in for `SeedSequence(seed)` in a new `PCG64`, providing its initial
+    # state from `words`, generated once per seed by `_SeedCache`. The actual
+    # `SeedSequence` is only created if needed, e.g. to spawn children.
+
+    def __init__(self, seed, words):
+        self.seed = seed
+        self.words = words
+
+    @functools.cached_property
+    def seed_seq(self):
+        return np.random.SeedSequence(self.seed)
+
+    def generate_state(self, n_words, dtype=np.uint32):
+        if n_words == 4 and dtype is np.uint64:
+            return self.words
+        return self.seed_seq.generate_state(n_words, dtype)
+
+    def spawn(self, n_children):
+        return self.seed_seq.spawn(n_children)
+
+    def __getattr__(self, name):
+        # `entropy`, `pool`, `n_children_spawned`...
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.seed_seq, name)
+
+
+class _SeedCache:
+    """Opt-in cache of the initial state of the generators made from integer seeds.
+
+    When `rng` is passed by keyword, decorated functions normalize it with
+    `np.random.default_rng`, which hashes an integer seed with `SeedSequence` on
+    every call. Code that calls decorated functions many times with the same few
+    seeds can avoid that with::
+
+        _rng_seeds.configure(maxsize=128)
+
+    The initial states of the `maxsize` most recently used seeds are then kept,
+    and each call gets a new `Generator` started from the cached state. Its
+    stream, and the children it spawns, are the same as those of
+    ``np.random.default_rng(seed)``.
+    """
+
+    def __init__(self):
+        self.configure(maxsize=0)
+
+    def configure(self, maxsize=128):
+        self.maxsize = maxsize
+        self._words = functools.lru_cache(maxsize)(self._generate) if maxsize else None
+
+    @staticmethod
+    def _generate(seed):
+        # What `PCG64`, used by `default_rng`, requests from its `SeedSequence`
+        words = np.random.SeedSequence(seed).generate_state(4, np.uint64)
+        words.flags.writeable = False
+        return words
+
+    def default_rng(self, seed):
+        """Same as `np.random.default_rng`, using the cache for integer seeds."""
+        if (
+            self._words is None
+            or not isinstance(seed, (int, np.integer))
+            or isinstance(seed, bool)
+            or seed < 0
+        ):
+            return np.random.default_rng(seed)
+        seed = int(seed)
+        seed_seq = _CachedSeedSequence(seed, self._words(seed))
+        return np.random.Generator(np.random.PCG64(seed_seq))
+
+
+_rng_seeds = _SeedCache()
+
+
+_context_rng = contextvars.ContextVar("rng", default=None)
+
+
+def _global_seed_set():
+    return np.random.mtrand._rand._bit_generator._seed_seq is None
+
+
+@functools.cache
+def _rng_index(fun):
+    # Number of positional arguments before `rng` in the signature of `fun`, or
+    # `sys.maxsize` if `rng` cannot be passed by position
+    for i, parameter in enumerate(inspect.signature(fun).parameters.values()):
+        if parameter.kind not in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        ):
+            break
+        if parameter.name == "rng":
+            return i
+    return sys.maxsize
+
+
+@contextlib.contextmanager
+def _rng_context(seed=None):
+    """Use a `Generator` of `seed` in decorated functions called without `rng`.
+
+    Instead of the global `RandomState`, functions decorated by the
+    `_transition_to_rng` of this module called in the ``with`` block without `rng` (by keyword, or by position) get the `Generator`
+    ``np.random.default_rng(seed)``. The generator is stored in a context
+    variable, so each thread or asyncio task entering its own context gets its
+    own stream, without locks, and without consuming the others'::
+
+        def task(seed):
+            with _rng_context(seed):
+                return library_function(1)
+
+        seeds = _spawn_seeds(123, n_tasks)
+        results = ThreadPoolExecutor().map(task, seeds)
+
+    Contexts do not protect a generator that is shared: asyncio tasks created
+    inside the block, or threads on Python builds where threads inherit the
+    context, use the same generator as the block. Enter the context within each
+    task for reproducible results.
+
+    Yields
+    ------
+    Generator
+
+    """
+    rng = np.random.default_rng(seed)
+    token = _context_rng.set(rng)
+    try:
+        yield rng
+    finally:
+        _context_rng.reset(token)
+
+
+def _transition_to_rng(old_name, *, position_num=None, end_version=None):
+    """`transition_to_rng._transition_to_rng`, with the features of this module.
+
+    Calls are passed on to the function decorated by ``transition_to_rng.py``,
+    after the generator of `_rng_seeds` or `_rng_context`, if any, is passed as
+    `rng`, which takes its fast path. Calls that warn are handled here, so
+    that the warnings go through `_rng_warnings`, and point to the caller.
+
+    The parameters are those of `transition_to_rng._transition_to_rng`.
+    """
+    transition = transition_to_rng._transition_to_rng(
+        old_name, position_num=position_num, end_version=end_version
+    )
+    old_kwarg_message, pos_arg_message, global_seed_message = (
+        transition_to_rng._warning_messages(old_name, end_version)
+    )
+    emit_warning = end_version is not None
+    max_args = sys.maxsize if position_num is None else position_num
+    ok_classes = (np.random.Generator, np.random.SeedSequence, np.random.BitGenerator)
+
+    def decorator(fun):
+        transitioned = transition(fun)
+
+        # Also copies the lazy signature
+        @functools.wraps(transitioned)
+        def wrapper(*args, **kwargs):
+            if "rng" in kwargs:
+                if _rng_seeds._words is not None and old_name not in kwargs:
+                    kwargs["rng"] = _rng_seeds.default_rng(kwargs["rng"])
+                return transitioned(*args, **kwargs)
+
+            if old_name in kwargs:
+                if not emit_warning or len(args) > max_args:
+                    return transitioned(*args, **kwargs)
+                _rng_warnings.warn(
+                    fun, old_kwarg_message, DeprecationWarning, stacklevel=2
+                )
+                kwargs["rng"] = kwargs.pop(old_name)
+                return fun(*args, **kwargs)
+
+            if len(args) > max_args:
+                if not emit_warning:
+                    return transitioned(*args, **kwargs)
+                arg = args[position_num]
+                if not (arg is None and not _global_seed_set()) and not isinstance(
+                    arg, ok_classes
+                ):
+                    _rng_warnings.warn(
+                        fun, pos_arg_message, FutureWarning, stacklevel=2
+                    )
+                return fun(*args, **kwargs)
+
+            # Without `position_num`, `rng` may still have been passed by position
+            rng = _context_rng.get()
+            if rng is not None and len(args) <= _rng_index(fun):
+                kwargs["rng"] = rng
+            elif emit_warning and _global_seed_set():
+                _rng_warnings.warn(
+                    fun, global_seed_message, FutureWarning, stacklevel=2
+                )
+                return fun(*args, **kwargs)
+            return transitioned(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _bit_generator(rng):
+    # Recent versions of NumPy wrap the `BitGenerator` of a `RandomState` in
+    # `default_rng`, older ones reject it
+    if rng is np.random:
+        rng = np.random.mtrand._rand
+    if isinstance(rng, np.random.RandomState):
+        return rng._bit_generator
+    return np.random.default_rng(rng).bit_generator
+
+
+def _spawn(bit_generator, n):
+    seed_seq = bit_generator.seed_seq
+    if not isinstance(seed_seq, np.random.bit_generator.ISpawnableSeedSequence):
+        # Generators seeded the legacy way, e.g. `RandomState(seed)`, cannot
+        # spawn: the children descend from words drawn from the generator
+        seed_seq = np.random.SeedSequence(bit_generator.random_raw(4))
+    return seed_seq.spawn(n)
+
+
+def _spawn_seeds(rng, n):
+    """Derive `n` independent seeds from an `rng` argument, for parallel workers.
+
+    `rng` is normalized with `np.random.default_rng`, as a decorated function
+    does after the transition, and its `SeedSequence` is spawned: the children
+    produce non-overlapping streams, and the same `rng` seed always gives the
+    same children. Spawning advances `rng`'s `SeedSequence`, so calling this
+    again with the same `Generator` gives new children.
+
+    Legacy arguments, a `RandomState` or `np.random` passed by position or as
+    `random_state`, cannot spawn. The children are then seeded from four words
+    drawn from them, so they still only depend on the state of the
+    `RandomState`, which is advanced.
+
+    The seeds are small and picklable, so they are a cheap way to send
+    randomness to worker processes, which call `np.random.default_rng(seed)`.
+
+    For results that do not depend on the number of workers, spawn one seed per
+    task (e.g. per chunk of the data) rather than one per worker.
+
+    Parameters
+    ----------
+    rng : {None, int, array_like[ints], SeedSequence, BitGenerator, Generator}
+        The value passed by the user as `rng`, or a legacy `RandomState`.
+    n : int
+        Number of seeds.
+
+    Returns
+    -------
+    list of SeedSequence
+
+    """
+    return _spawn(_bit_generator(rng), n)
+
+
+def _spawn_rngs(rng, n):
+    """Derive `n` independent `Generator`s from an `rng` argument.
+
+    Same as `_spawn_seeds`, but returns generators ready to use in threads, each
+    with the same kind of `BitGenerator` as ``np.random.default_rng(rng)``.
+    """
+    bit_generator = _bit_generator(rng)
+    return [
+        np.random.Generator(type(bit_generator)(seed))
+        for seed in _spawn(bit_generator, n)
+    ]
+
+
+# Functions that run in parallel give each task its own child generator, derived
+# from `rng`, so that the result is reproducible and does not depend on the
+# number of `workers`. For process pools, pass seeds from `_spawn_seeds` instead.
+@_transition_to_rng("random_state", position_num=1)
+def parallel_function(arg1, rng=None, arg2=0, *, workers=1):
+    rngs = _spawn_rngs(rng, len(arg1))
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(lambda x, rng: rng.random() * x + arg2, arg1, rngs))
@@ -0,0 +1,423 @@
+"""
+Find and Transition Legacy PRNG Arguments
+=========================================
+
+Scan a code base for functions that still take a legacy PRNG argument
+(``random_state`` or ``seed``), call ``check_random_state``, or use the global
+NumPy random state, and optionally apply the `_transition_to_rng` decorator of
+``transition_to_rng.py`` to them::
+
+    python scan_rng_usage.py scipy/
+    python scan_rng_usage.py scipy/ --apply --import-from scipy._lib._util
+
+For each function with a legacy argument, ``old_name`` and ``position_num``
+are inferred from its signature. With ``--apply``, the decorator is added to
+the module-level functions and methods that pass that argument to
+``check_random_state`` or ``default_rng``, the argument is renamed to ``rng``
+in the signature, and the old name is kept as an alias at the top of the body,
+as in the examples of ``transition_to_rng.py``.
+
+Files are parsed in a process pool. With ``--cache PATH``, results are cached
+by content hash, so re-running after a few edits only parses the edited
+files.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+OLD_NAMES = ("random_state", "seed")
+NEW_NAME = "rng"
+DECORATOR = "_transition_to_rng"
+# Changed when the results of a scan change, to invalidate cached ones
+CACHE_VERSION = 2
+
+# Module-level functions of `np.random` that use the global `RandomState`
+GLOBAL_STATE = {
+    "seed", "get_state", "set_state", "rand", "randn", "randint", "random",
+    "random_sample", "choice", "shuffle", "permutation", "normal", "uniform",
+}  # fmt: skip
+
+Finding = namedtuple(
+    "Finding",
+    "path lineno name old_name position_num check_random_state global_state decorated",
+)
+Finding.__doc__ = """A function using legacy PRNG arguments or global state.
+
+`old_name` is None if the function has no legacy argument, and `position_num`
+is None if that argument is keyword-only. `decorated` is True if the function
+already uses `_transition_to_rng`.
+"""
+
+
+def _call_name(node):
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _uses_global_state(node):
+    # np.random.<function>(...) or numpy.random.<function>(...)
+    func = node.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr in GLOBAL_STATE
+        and isinstance(func.value, ast.Attribute)
+        and func.value.attr == "random"
+        and isinstance(func.value.value, ast.Name)
+        and func.value.value.id in ("np", "numpy")
+    )
+
+
+def _walk_body(node):
+    # Nodes of the body of a function, without those of the functions and
+    # classes it defines, which are reported on their own
+    stack = list(node.body)
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            stack.extend(ast.iter_child_nodes(child))
+
+
+def _validates(node, name):
+    # Whether the function `node` passes its argument `name` to
+    # `check_random_state` or `default_rng`, so that it is a PRNG argument
+    return any(
+        isinstance(call, ast.Call)
+        and _call_name(call) in ("check_random_state", "default_rng")
+        and any(
+            isinstance(arg, ast.Name) and arg.id == name
+            for arg in call.args + [keyword.value for keyword in call.keywords]
+        )
+        for call in _walk_body(node)
+    )
+
+
+def scan_source(source, path="<string>", old_names=OLD_NAMES):
+    """Find the functions of a module that need transitioning.
+
+    Parameters
+    ----------
+    source : str or bytes
+        Python source code.
+    path : str
+        File name, used in the findings.
+    old_names : tuple of str
+        Names of legacy PRNG arguments.
+
+    Returns
+    -------
+    list of Finding
+
+    """
+    findings = []
+    for node in ast.walk(ast.parse(source, filename=path)):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+
+        args = node.args
+        positional = [arg.arg for arg in args.posonlyargs + args.args]
+        keyword = [arg.arg for arg in args.kwonlyargs]
+        old_name = next((n for n in positional + keyword if n in old_names), None)
+        position_num = positional.index(old_name) if old_name in positional else None
+
+        calls = [n for n in _walk_body(node) if isinstance(n, ast.Call)]
+        check = any(_call_name(call) == "check_random_state" for call in calls)
+        global_state = any(_uses_global_state(call) for call in calls)
+        decorated = any(
+            isinstance(d, ast.Call) and _call_name(d) == DECORATOR
+            for d in node.decorator_list
+        )
+
+        if old_name or check or global_state:
+            findings.append(
+                Finding(
+                    path,
+                    node.lineno,
+                    node.name,
+                    old_name,
+                    position_num,
+                    check,
+                    global_state,
+                    decorated,
+                )
+            )
+    return sorted(findings, key=lambda finding: finding.lineno)
+
+
+def _scan_file(path, old_names):
+    # Files that cannot be parsed are reported rather than ending the scan, and
+    # cached like the others. `ValueError` includes `UnicodeDecodeError`
+    try:
+        findings = scan_source(Path(path).read_bytes(), path, old_names)
+    except (SyntaxError, ValueError) as exc:
+        return {"skipped": f"{type(exc).__name__}: {exc}"}
+    return [list(finding) for finding in findings]
+
+
+def iter_python_files(paths):
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(path.rglob("*.py"))
+        else:
+            yield path
+
+
+def scan(paths, cache_path=None, max_workers=None, old_names=OLD_NAMES):
+    """Scan Python files in parallel, reusing cached results.
+
+    Parameters
+    ----------
+    paths : iterable of str or Path
+        Files, and directories searched recursively for ``*.py`` files.
+    cache_path : str or Path, optional
+        JSON file of earlier results, keyed by the SHA-256 of file contents. It
+        is updated with the results of this scan.
+    max_workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    old_names : tuple of str
+        Names of legacy PRNG arguments.
+
+    Returns
+    -------
+    findings : list of Finding
+        In the order of the files, then of their lines.
+    n_parsed : int
+        Number of files that were not in the cache.
+    skipped : dict
+        Reason why each file that could not be parsed, e.g. because of a
+        syntax error, was skipped, by path.
+
+    """
+    cache = {}
+    if cache_path is not None and os.path.exists(cache_path):
+        with open(cache_path) as fh:
+            cache = json.load(fh)
+    # Results depend on the names searched for, and on the version of the scan
+    salt = f"{CACHE_VERSION}:{','.join(old_names)}".encode()
+
+    files = {}
+    for path in iter_python_files(paths):
+        digest = hashlib.sha256(salt + path.read_bytes()).hexdigest()
+        files[str(path)] = digest
+
+    missing = [path for path, digest in files.items() if digest not in cache]
+    if len(missing) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = executor.map(
+                _scan_file, missing, [old_names] * len(missing), chunksize=16
+            )
+            cache |= {files[path]: result for path, result in zip(missing, results)}
+    else:
+        cache |= {files[path]: _scan_file(path, old_names) for path in missing}
+
+    if cache_path is not None:
+        used = {digest: cache[digest] for digest in files.values()}
+        with open(cache_path, "w") as fh:
+            json.dump(used, fh)
+
+    findings = []
+    skipped = {}
+    for path, digest in files.items():
+        result = cache[digest]
+        if isinstance(result, dict):
+            skipped[path] = result["skipped"]
+        else:
+            # The cache may come from a file with the same contents elsewhere
+            findings.extend(Finding(path, *finding[1:]) for finding in result)
+    return findings, len(missing), skipped
+
+
+def apply_edits(source, findings, end_version=None, import_from=None):
+    """Decorate the functions of `findings` that have a legacy argument.
+
+    Each function gets ``@_transition_to_rng(old_name, position_num=...)`` as
+    its innermost decorator, its legacy argument is renamed to ``rng``, and
+    ``old_name = rng`` is inserted at the top of its body.
+
+    Only module-level functions and methods are decorated, and only if they
+    pass the legacy argument to ``check_random_state`` or ``default_rng``:
+    other arguments named e.g. ``seed`` need not be PRNG seeds. Functions
+    already decorated, with a parameter already named ``rng``, or whose body
+    starts on the line of their signature, are also left as is.
+
+    Parameters
+    ----------
+    source : str
+        Python source code of the module of `findings`.
+    findings : list of Finding
+        Output of `scan_source` for `source`.
+    end_version : str, optional
+        Passed to the decorator, to emit warnings.
+    import_from : str, optional
+        Module from which to import `_transition_to_rng` if any function is
+        decorated and it is not imported yet.
+
+    Returns
+    -------
+    new_source : str
+    edited : list of Finding
+        The findings that were applied.
+
+    """
+    lines = source.splitlines(keepends=True)
+    tree = ast.parse(source)
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    nodes = {
+        node.lineno: node
+        for node in tree.body + [n for c in classes for n in c.body]
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+
+    edits = []  # (line index, byte start, byte end, replacement)
+    edited = []
+    for finding in findings:
+        node = nodes.get(finding.lineno)
+        if node is None or finding.old_name is None or finding.decorated:
+            continue
+        if not _validates(node, finding.old_name):
+            continue
+        args = node.args
+        all_args = args.posonlyargs + args.args + args.kwonlyargs
+        if NEW_NAME in [arg.arg for arg in all_args]:
+            continue
+        first = node.body[0]
+        if first.lineno == node.lineno:
+            continue
+        first_line = min(
+            [first.lineno] + [d.lineno for d in getattr(first, "decorator_list", [])]
+        )
+
+        # Insert the alias after the docstring, if any
+        has_docstring = (
+            isinstance(first, ast.Expr)
+            and isinstance(first.value, ast.Constant)
+            and isinstance(first.value.value, str)
+        )
+        after = first.end_lineno if has_docstring else first_line - 1
+        indent = " " * first.col_offset
+        alias = f"{indent}{finding.old_name} = {NEW_NAME}\n"
+        edits.append((after, 0, 0, alias))
+
+        arg = next(arg for arg in all_args if arg.arg == finding.old_name)
+        start = arg.col_offset
+        edits.append((arg.lineno - 1, start, start + len(arg.arg), NEW_NAME))
+
+        # Innermost, so that e.g. `staticmethod` still applies to a function
+        indent = " " * node.col_offset
+        options = [f'"{finding.old_name}"']
+        if finding.position_num is not None:
+            options.append(f"position_num={finding.position_num}")
+        if end_version is not None:
+            options.append(f'end_version="{end_version}"')
+        decorator = f"{indent}@{DECORATOR}({', '.join(options)})\n"
+        edits.append((node.lineno - 1, 0, 0, decorator))
+        edited.append(finding)
+
+    # From the end, so that earlier positions stay valid. On a line, renames
+    # come before insertions above it, and insertions at the same place end
+    # up in the order they were made
+    order = sorted(
+        range(len(edits)),
+        key=lambda i: (edits[i][0], edits[i][1] != edits[i][2], i),
+        reverse=True,
+    )
+    for index, start, end, text in map(edits.__getitem__, order):
+        if start == end:
+            lines.insert(index, text)
+        else:
+            # AST columns are offsets in UTF-8 bytes
+            line = lines[index].encode()
+            lines[index] = (line[:start] + text.encode() + line[end:]).decode()
+
+    new_source = "".join(lines)
+    if edited and import_from and f"import {DECORATOR}" not in new_source:
+        new_source = _add_import(new_source, f"from {import_from} import {DECORATOR}\n")
+    return new_source, edited
+
+
+def _add_import(source, statement):
+    # After the last top-level import, or the module docstring
+    tree = ast.parse(source)
+    lineno = 0
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lineno = node.end_lineno
+        elif lineno == 0 and isinstance(node, ast.Expr) and node is tree.body[0]:
+            lineno = node.end_lineno
+    lines = source.splitlines(keepends=True)
+    lines.insert(lineno, statement)
+    return "".join(lines)
+
+
+def format_finding(finding):
+    if finding.old_name is None:
+        what = "no legacy argument"
+    else:
+        what = f'{DECORATOR}("{finding.old_name}", position_num={finding.position_num})'
+        if finding.decorated:
+            what += ", already decorated"
+    notes = [
+        note
+        for note, present in [
+            ("calls check_random_state", finding.check_random_state),
+            ("uses the global random state", finding.global_state),
+        ]
+        if present
+    ]
+    return f"{finding.path}:{finding.lineno}: {finding.name}: " + "; ".join(
+        [what] + notes
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("paths", nargs="+", help="files or directories to scan")
+    parser.add_argument("--old-names", nargs="+", default=list(OLD_NAMES))
+    parser.add_argument("-j", "--jobs", type=int, help="number of worker processes")
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="file of cached results, to only parse changed files again",
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="decorate the functions found"
+    )
+    parser.add_argument("--end-version", help="end_version passed to the decorator")
+    parser.add_argument("--import-from", help="module to import the decorator from")
+    args = parser.parse_args(argv)
+
+    findings, n_parsed, skipped = scan(
+        args.paths, args.cache or None, args.jobs, tuple(args.old_names)
+    )
+    for finding in findings:
+        print(format_finding(finding))
+    for path, reason in skipped.items():
+        print(f"{path}: skipped: {reason}")
+    print(f"{len(findings)} functions found, {n_parsed} files parsed")
+
+    if args.apply:
+        by_path = {}
+        for finding in findings:
+            by_path.setdefault(finding.path, []).append(finding)
+        for path, file_findings in by_path.items():
+            source = Path(path).read_text()
+            new_source, edited = apply_edits(
+                source, file_findings, args.end_version, args.import_from
+            )
+            if edited:
+                Path(path).write_text(new_source)
+                print(f"Decorated {len(edited)} functions in {path}")
+
+
+if __name__ == "__main__":
+    main()
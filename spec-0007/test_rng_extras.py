@@ -0,0 +1,288 @@
+import asyncio
+import inspect
+import io
+import pickle
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import transition_to_rng
+from rng_extras import (
+    _rng_context,
+    _rng_seeds,
+    _rng_warnings,
+    _spawn_rngs,
+    _spawn_seeds,
+    _transition_to_rng,
+    parallel_function,
+)
+from test_transition_to_rng import np_random_seed
+
+
+@_transition_to_rng("random_state", position_num=1, end_version="1.17.0")
+def library_function(arg1, rng=None, arg2=0):
+    rng = np.random.default_rng(rng)
+    return arg1, rng.random(), arg2
+
+
+@pytest.fixture
+def rng_warnings():
+    yield _rng_warnings
+    _rng_warnings.configure()
+    _rng_warnings.counts.clear()
+
+
+def call_in_loop(n, **kwargs):
+    for _ in range(n):
+        library_function(1, **kwargs)
+
+
+@pytest.mark.parametrize("once, expected", [(None, 6), ("location", 2), ("process", 1)])
+def test_warn_once(rng_warnings, once, expected):
+    rng_warnings.configure(once=once)
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("always")
+        call_in_loop(3, random_state=1)
+        for _ in range(3):
+            library_function(1, random_state=1)
+        # Other warnings are not suppressed
+        library_function(1, 1)
+
+    assert [w.category for w in record] == [DeprecationWarning] * expected + [
+        FutureWarning
+    ]
+    assert {w.filename for w in record} == {__file__}
+
+
+def test_warning_report(rng_warnings):
+    rng_warnings.configure(once="process", report=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        call_in_loop(3, random_state=1)
+        library_function(1, 1)
+
+    report = io.StringIO()
+    rng_warnings.print_report(report)
+    lines = report.getvalue().splitlines()
+    assert len(lines) == 3
+    assert lines[1].split()[:5] == [
+        "3",
+        "x",
+        "DeprecationWarning",
+        "from",
+        "library_function()",
+    ]
+    assert lines[2].split()[:3] == ["1", "x", "FutureWarning"]
+    assert f" at {__file__}:" in lines[2]
+
+    with pytest.raises(ValueError, match="once"):
+        rng_warnings.configure(once="always")
+
+
+def test_same_behavior(rng_warnings):
+    # Unless a feature is used, decorated functions behave as with the decorator
+    # of transition_to_rng.py, which they call, and warnings are not counted
+    plain = transition_to_rng._transition_to_rng(
+        "random_state", position_num=1, end_version="1.17.0"
+    )(library_function.__wrapped__.__wrapped__)
+    assert inspect.signature(library_function) == inspect.signature(plain)
+
+    calls = [((1,), {"rng": 1}), ((1, 1), {}), ((1,), {"random_state": 1})]
+    for configure in [{}, {"once": "location"}]:
+        rng_warnings.configure(**configure)
+        for args, kwargs in calls:
+            with warnings.catch_warnings(record=True) as record:
+                warnings.simplefilter("always")
+                result = library_function(*args, **kwargs)
+            with warnings.catch_warnings(record=True) as expected:
+                warnings.simplefilter("always")
+                assert result == plain(*args, **kwargs)
+            assert [(w.category, str(w.message)) for w in record] == [
+                (w.category, str(w.message)) for w in expected
+            ]
+            assert {w.filename for w in record} <= {__file__}
+    assert not rng_warnings.counts
+
+    with pytest.raises(TypeError, match="multiple values"):
+        library_function(1, rng=1, random_state=1)
+    with np_random_seed():
+        with pytest.warns(FutureWarning, match="NumPy global RNG"):
+            library_function(1)
+
+
+@pytest.fixture
+def rng_seeds():
+    _rng_seeds.configure(maxsize=2)
+    yield _rng_seeds
+    _rng_seeds.configure(maxsize=0)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2**70, np.uint32(7)])
+def test_seed_cache_streams(rng_seeds, seed):
+    for _ in range(2):  # cache miss, then hit
+        rng = rng_seeds.default_rng(seed)
+        ref = np.random.default_rng(seed)
+        assert rng.random() == ref.random()
+        assert np.array_equal(rng.integers(0, 100, 10), ref.integers(0, 100, 10))
+        assert np.array_equal(rng.normal(size=5), ref.normal(size=5))
+        assert rng.bit_generator.state == ref.bit_generator.state
+
+        # Children, and the seed sequence itself, match those of `default_rng`
+        assert [c.random() for c in rng.spawn(3)] == [c.random() for c in ref.spawn(3)]
+        assert _spawn_seeds(rng, 1)[0].entropy == _spawn_seeds(ref, 1)[0].entropy
+        assert rng.bit_generator.seed_seq.entropy == seed
+
+        copy = pickle.loads(pickle.dumps(rng))
+        assert copy.random() == rng.random()
+
+
+def test_seed_cache(rng_seeds):
+    words = rng_seeds._words
+    for seed in [1, 2, 1, 3, 1]:
+        library_function(1, rng=seed)
+    assert words.cache_info().hits == 2
+    assert words.cache_info().currsize == 2
+
+    # Not for other kinds of seeds, which give the same result as without cache
+    for seed in [None, [1, 2], np.random.SeedSequence(1), True]:
+        assert type(rng_seeds.default_rng(seed)) is np.random.Generator
+    assert words.cache_info().misses == 3
+    with pytest.raises(ValueError):
+        rng_seeds.default_rng(-1)
+
+    # Disabled by default
+    rng_seeds.configure(maxsize=0)
+    assert rng_seeds.default_rng(1).bit_generator.seed_seq.__class__ is (
+        np.random.SeedSequence
+    )
+
+
+def test_rng_context():
+    with np_random_seed():
+        with _rng_context(1) as rng:
+            # No warning about the global seed, which is not used
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                res = [library_function(1)[1] for _ in range(3)]
+            # The context generator was used
+            fresh = np.random.default_rng(1)
+            assert rng.bit_generator.state != fresh.bit_generator.state
+        assert res == list(np.random.default_rng(1).random(3))
+
+        # Explicit arguments still win
+        with _rng_context(1):
+            assert library_function(1, rng=2) == library_function(1, rng=2)
+        with pytest.warns(FutureWarning, match="NumPy global RNG"):
+            library_function(1)
+
+
+def test_rng_context_positional():
+    # Without `position_num`, `rng` passed by position is not replaced
+    @_transition_to_rng("random_state")
+    def library_function(a, rng=None):
+        return rng
+
+    rng = np.random.default_rng(2)
+    with _rng_context(1) as context_rng:
+        assert library_function(1, rng) is rng
+        assert library_function(1) is context_rng
+        assert library_function(a=1) is context_rng
+
+
+def draws_in_context(seed, n=200):
+    with _rng_context(seed):
+        return [library_function(1)[1] for _ in range(n)]
+
+
+def test_rng_context_threads():
+    # Under free-threaded CPython too, each task uses its own generator, so the
+    # results do not depend on scheduling
+    seeds = range(64)
+    expected = [draws_in_context(seed) for seed in seeds]
+    barrier = threading.Barrier(8)
+
+    def task(seed):
+        if seed < 8:
+            barrier.wait()  # make the first tasks overlap
+        return draws_in_context(seed)
+
+    for _ in range(3):
+        with ThreadPoolExecutor(8) as executor:
+            assert list(executor.map(task, seeds)) == expected
+
+
+def test_rng_context_asyncio():
+    async def task(seed):
+        with _rng_context(seed):
+            draws = []
+            for _ in range(10):
+                draws.append(library_function(1)[1])
+                await asyncio.sleep(0)  # interleave with the other tasks
+            return draws
+
+    async def main():
+        return await asyncio.gather(*(task(seed) for seed in range(10)))
+
+    expected = [draws_in_context(seed, 10) for seed in range(10)]
+    assert asyncio.run(main()) == expected
+
+
+def test_spawn_rngs():
+    children = _spawn_rngs(123, 4)
+    draws = [rng.random(8) for rng in children]
+    assert len({tuple(d) for d in draws}) == 4  # independent streams
+    # Reproducible, and the same streams as the corresponding seeds
+    assert np.array_equal(draws, [rng.random(8) for rng in _spawn_rngs(123, 4)])
+    seeds = _spawn_seeds(123, 4)
+    assert np.array_equal(draws, [np.random.default_rng(s).random(8) for s in seeds])
+
+    # Spawning from the same Generator again gives new children
+    rng = np.random.default_rng(123)
+    first, second = _spawn_rngs(rng, 1), _spawn_rngs(rng, 1)
+    assert first[0].random() != second[0].random()
+
+
+@pytest.mark.parametrize("legacy", ["RandomState", "np.random"])
+def test_spawn_legacy(legacy):
+    # Legacy generators cannot spawn, but their state determines the children
+    def states():
+        if legacy == "np.random":
+            np.random.mtrand._rand.seed(1)
+            return np.random
+        return np.random.RandomState(1)
+
+    with np_random_seed():
+        seeds = _spawn_seeds(states(), 3)
+        assert [s.generate_state(2).tolist() for s in seeds] == [
+            s.generate_state(2).tolist() for s in _spawn_seeds(states(), 3)
+        ]
+        draws = [rng.random() for rng in _spawn_rngs(states(), 3)]
+        assert len(set(draws)) == 3
+        assert draws == [rng.random() for rng in _spawn_rngs(states(), 3)]
+
+        # A `RandomState` passed by position or as `random_state` is accepted
+        arg1 = np.arange(4.0)
+        expected = parallel_function(arg1, states())
+        assert parallel_function(arg1, random_state=states(), workers=2) == expected
+
+
+def sample(seed):
+    return np.random.default_rng(seed).random(4)
+
+
+def test_spawn_seeds_for_processes():
+    seeds = _spawn_seeds(np.random.default_rng(5), 3)
+    with ProcessPoolExecutor(2) as executor:
+        draws = list(executor.map(sample, seeds))
+    assert np.array_equal(draws, [sample(seed) for seed in seeds])
+
+
+def test_parallel_function():
+    arg1 = np.arange(10.0)
+    expected = parallel_function(arg1, rng=42)
+    assert parallel_function(arg1, rng=42, workers=4) == expected
+    assert parallel_function(arg1, random_state=42, workers=2) == expected
+    assert parallel_function(arg1, rng=43) != expected
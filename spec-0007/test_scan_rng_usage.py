@@ -0,0 +1,203 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from scan_rng_usage import Finding, apply_edits, main, scan, scan_source
+
+SOURCE = '''\
+import numpy as np
+from scipy._lib._util import check_random_state
+
+
+def positional(x, random_state=None):
+    """Docstring
+    over two lines."""
+    random_state = check_random_state(random_state)
+    return random_state.random(x)
+
+
+class Sampler:
+    @staticmethod
+    def method(n, *, seed=None):
+        return np.random.default_rng(seed).random(n)
+
+
+def global_state(n):
+    np.random.seed(1234)
+    return np.random.rand(n)
+
+
+def outer(n, random_state=None):
+    @functools.cache
+    def inner(seed=None):
+        return seed
+
+    return inner()
+
+
+def one_line(random_state=None): return random_state
+
+
+def unrelated(x):
+    return x
+'''
+
+
+def test_scan_source():
+    findings = {finding.name: finding for finding in scan_source(SOURCE, "module.py")}
+    assert list(findings) == [
+        "positional",
+        "method",
+        "global_state",
+        "outer",
+        "inner",
+        "one_line",
+    ]
+    assert findings["positional"] == Finding(
+        "module.py", 5, "positional", "random_state", 1, True, False, False
+    )
+    # Keyword-only arguments have no position
+    assert findings["method"].old_name == "seed"
+    assert findings["method"].position_num is None
+    assert findings["global_state"].old_name is None
+    assert findings["global_state"].global_state
+    assert findings["inner"].position_num == 0
+
+    decorated = '@_transition_to_rng("random_state")\ndef f(random_state=None):\n  pass'
+    assert scan_source(decorated)[0].decorated
+
+    # Calls in nested functions are not attributed to the enclosing one
+    nested = "def f():\n  def g():\n    np.random.rand()\n    check_random_state(1)\n"
+    assert [
+        (f.name, f.global_state, f.check_random_state) for f in scan_source(nested)
+    ] == [("g", True, True)]
+
+
+def test_apply_edits():
+    findings = scan_source(SOURCE)
+    new_source, edited = apply_edits(
+        SOURCE, findings, end_version="1.17.0", import_from="transition_to_rng"
+    )
+    # Only module-level functions and methods that validate their legacy
+    # argument, and whose body is on its own lines
+    assert [finding.name for finding in edited] == ["positional", "method"]
+    assert "from transition_to_rng import _transition_to_rng\n" in new_source
+    assert (
+        "    @staticmethod\n"
+        '    @_transition_to_rng("seed", end_version="1.17.0")\n'
+        "    def method(n, *, rng=None):\n"
+    ) in new_source
+    assert (
+        '@_transition_to_rng("random_state", position_num=1, end_version="1.17.0")\n'
+        "def positional(x, rng=None):\n"
+        '    """Docstring\n    over two lines."""\n'
+        "    random_state = rng\n"
+    ) in new_source
+    assert (
+        "def outer(n, random_state=None):\n"
+        "    @functools.cache\n"
+        "    def inner(seed=None):\n"
+    ) in new_source
+    assert "def one_line(random_state=None): return random_state" in new_source
+
+    # A second run finds nothing more to do
+    assert apply_edits(new_source, scan_source(new_source))[1] == []
+
+    # Arguments that are not PRNG seeds are not renamed, even when validated in
+    # a nested function
+    source = (
+        "def digest(data, seed=0):\n    return hash((data, seed))\n\n\n"
+        "def f(seed=None):\n    def g():\n        return default_rng(seed)\n"
+    )
+    assert apply_edits(source, scan_source(source)) == (source, [])
+
+
+def test_apply_edits_runs(tmp_path):
+    source = (
+        "import numpy as np\n\n"
+        "def f(x, random_state=None):\n"
+        "    return np.random.default_rng(random_state).random(x)\n"
+    )
+    new_source, _ = apply_edits(
+        source, scan_source(source), end_version="1.17.0", import_from="x"
+    )
+    namespace = {}
+    exec(
+        new_source.replace("from x import", "from transition_to_rng import"), namespace
+    )
+    f = namespace["f"]
+
+    assert f(2, rng=1).tolist() == np.random.default_rng(1).random(2).tolist()
+    with pytest.warns(DeprecationWarning, match="random_state"):
+        f(2, random_state=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        f(2, np.random.default_rng(1))
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_scan_cache(tmp_path, max_workers):
+    package = tmp_path / "package"
+    (package / "sub").mkdir(parents=True)
+    for i in range(4):
+        (package / f"module{i}.py").write_text(SOURCE)
+    (package / "sub" / "other.py").write_text("def f(seed): pass\n")
+    cache = tmp_path / "cache.json"
+
+    findings, n_parsed, skipped = scan([package], cache, max_workers)
+    assert n_parsed == 5
+    assert skipped == {}
+    assert len(findings) == 4 * 6 + 1
+    assert findings[0].path == str(package / "module0.py")
+    assert findings[-1] == Finding(
+        str(package / "sub" / "other.py"), 1, "f", "seed", 0, False, False, False
+    )
+
+    # Unchanged files are not parsed again, changed ones are
+    assert scan([package], cache, max_workers) == (findings, 0, {})
+    (package / "sub" / "other.py").write_text("def f(x, seed): pass\n")
+    findings, n_parsed, _ = scan([package], cache, max_workers)
+    assert n_parsed == 1
+    assert findings[-1].position_num == 1
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_scan_skips_invalid_files(tmp_path, capsys, max_workers):
+    for i in range(2):
+        (tmp_path / f"module{i}.py").write_text(SOURCE)
+    python2 = tmp_path / "python2.py"
+    python2.write_text('def f(seed):\n    print "x"\n')
+    latin1 = tmp_path / "latin1.py"
+    latin1.write_bytes(b'seed = "\xe9"\n')
+    cache = tmp_path / "cache.json"
+
+    findings, n_parsed, skipped = scan([tmp_path], cache, max_workers)
+    assert n_parsed == 4
+    assert len(findings) == 2 * 6
+    assert list(skipped) == [str(latin1), str(python2)]
+    assert skipped[str(python2)].startswith("SyntaxError: Missing parentheses")
+
+    # Skipped files are cached too
+    assert scan([tmp_path], cache, max_workers) == (findings, 0, skipped)
+
+    main([str(tmp_path), "--cache", str(cache)])
+    output = capsys.readouterr().out
+    assert f"{python2}: skipped: SyntaxError: Missing parentheses" in output
+    assert "12 functions found, 0 files parsed" in output
+
+
+def test_main_apply(tmp_path, capsys):
+    module = tmp_path / "module.py"
+    module.write_text(SOURCE)
+    main([str(module), "--apply", "--import-from", "pkg.util"])
+    output = capsys.readouterr().out
+    expected = '_transition_to_rng("random_state", position_num=1)'
+    assert f"{module}:5: positional: {expected}" in output
+    assert f"{module}:18: global_state: no legacy argument; uses the global" in output
+    assert "6 functions found, 1 files parsed" in output
+    assert "skipped" not in output
+    assert f"Decorated 2 functions in {module}" in output
+    assert "from pkg.util import _transition_to_rng" in module.read_text()
+    # Nothing is cached unless asked
+    assert list(tmp_path.iterdir()) == [module]
@@ -1,4 +1,6 @@
 import contextlib
+import inspect
+import pickle
 
 import numpy as np
 import pytest
@@ -80,6 +82,48 @@ def test_rng_incorrect_usage():
         library_function(1, rng=1, random_state=1)
 
 
+def test_rng_generator_fast_path():
+    @_transition_to_rng("random_state", position_num=1, end_version="1.17.0")
+    def library_function(arg1, rng=None, arg2=0):
+        return rng
+
+    rng = np.random.default_rng(1)
+    with np_random_seed():
+        assert library_function(1, rng=rng) is rng
+        assert library_function(arg1=1, rng=rng, arg2=2) is rng
+
+    with pytest.raises(TypeError, match="multiple values"):
+        library_function(1, rng, rng=rng)
+    with pytest.raises(TypeError, match="multiple values"):
+        library_function(1, rng=rng, random_state=rng)
+
+
+def test_signature(monkeypatch):
+    calls = []
+    signature = inspect.signature
+    monkeypatch.setattr(
+        inspect, "signature", lambda f, **kw: calls.append(f) or signature(f, **kw)
+    )
+
+    def library_function(arg1, rng=None, arg2: int = 0) -> float:
+        pass
+
+    decorated = _transition_to_rng("random_state", position_num=1)(library_function)
+    assert calls == []
+
+    # Computed on first use only
+    sig = signature(decorated)
+    assert str(sig) == "(arg1, rng=None, arg2: int = 0, *, random_state=None) -> float"
+    assert calls == [library_function]
+    assert signature(decorated) is sig
+    assert list(signature(decorated).parameters)[-1] == "random_state"
+    assert calls == [library_function]
+
+    assert sig.bind(1, random_state=2).arguments == {"arg1": 1, "random_state": 2}
+    assert str(sig.replace(return_annotation=int)).endswith("-> int")
+    assert pickle.loads(pickle.dumps(sig)) == sig
+
+
 def test_seeded_vs_unseeded():
     with np_random_seed():
         with pytest.warns(FutureWarning, match="NumPy global RNG"):
@@ -1,9 +1,87 @@
 import numpy as np
 import functools
 import inspect
+import sys
 import warnings
 
 
+class _LazySignature(inspect.Signature):
+    """Signature of `fun` with an extra keyword-only parameter `old_name`.
+
+    `inspect.signature` is only called on first use of the signature; until then
+    the slots of `inspect.Signature` are unset, so reading them ends up here.
+    """
+
+    __slots__ = ("_fun", "_old_name", "_signature")
+
+    def __init__(self, fun, old_name):
+        self._fun = fun
+        self._old_name = old_name
+
+    def __getattr__(self, name):
+        if name not in ("_parameters", "_return_annotation", "_signature"):
+            raise AttributeError(name)
+        signature = inspect.signature(self._fun)
+        self._signature = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(
+                    self._old_name, inspect.Parameter.KEYWORD_ONLY, default=None
+                ),
+            ]
+        )
+        self._parameters = self._signature.parameters
+        self._return_annotation = self._signature.return_annotation
+        return getattr(self, name)
+
+    # Both would create a `_LazySignature` from a plain signature's arguments
+    def replace(self, **changes):
+        return self._signature.replace(**changes)
+
+    def __reduce__(self):
+        return self._signature.__reduce__()
+
+
+def _warning_messages(old_name, end_version):
+    # Messages of the warnings about keyword `old_name`, positional `rng` and the
+    # global seed, formatted once when the decorator is applied
+    NEW_NAME = "rng"
+
+    cmn_msg = (
+        "To silence this warning and ensure consistent behavior in SciPy "
+        f"{end_version}, control the RNG using argument `{NEW_NAME}`. Arguments passed "
+        f"to keyword `{NEW_NAME}` will be validated by `np.random.default_rng`, so the "
+        "behavior corresponding with a given value may change compared to use of "
+        f"`{old_name}`. For example, "
+        "1) `None` will result in unpredictable random numbers, "
+        "2) an integer will result in a different stream of random numbers, (with the "
+        "same distribution), and "
+        "3) `np.random` or `RandomState` instances will result in an error. "
+        "See the documentation of `default_rng` for more information."
+    )
+
+    old_kwarg_message = (
+        f"Use of keyword argument `{old_name}` is "
+        f"deprecated and replaced by `{NEW_NAME}`.  "
+        f"Support for `{old_name}` will be removed "
+        f"in SciPy {end_version}."
+    ) + cmn_msg
+    pos_arg_message = (
+        f"Positional use of `{NEW_NAME}` (formerly known as "
+        f"`{old_name}`) is still allowed, but the behavior is "
+        "changing: the argument will be normalized using "
+        f"`np.random.default_rng` beginning in SciPy {end_version}, "
+        "and the resulting `Generator` will be used to generate "
+        "random numbers."
+    ) + cmn_msg
+    global_seed_message = (
+        "The NumPy global RNG was seeded by calling "
+        f"`np.random.seed`. Beginning in {end_version}, this "
+        "function will no longer use the global RNG."
+    ) + cmn_msg
+    return old_kwarg_message, pos_arg_message, global_seed_message
+
+
 def _transition_to_rng(old_name, *, position_num=None, end_version=None):
     """Example decorator to transition from old PRNG usage to new `rng` behavior
 
@@ -72,27 +150,42 @@ def _transition_to_rng(old_name, *, position_num=None, end_version=None):
     """
     NEW_NAME = "rng"
 
-    cmn_msg = (
-        "To silence this warning and ensure consistent behavior in SciPy "
-        f"{end_version}, control the RNG using argument `{NEW_NAME}`. Arguments passed "
-        f"to keyword `{NEW_NAME}` will be validated by `np.random.default_rng`, so the "
-        "behavior corresponding with a given value may change compared to use of "
-        f"`{old_name}`. For example, "
-        "1) `None` will result in unpredictable random numbers, "
-        "2) an integer will result in a different stream of random numbers, (with the "
-        "same distribution), and "
-        "3) `np.random` or `RandomState` instances will result in an error. "
-        "See the documentation of `default_rng` for more information."
+    old_kwarg_message, pos_arg_message, global_seed_message = _warning_messages(
+        old_name, end_version
+    )
+
+    # Everything that does not depend on the call is computed once, here
+    emit_warning = end_version is not None
+    # The PRNG is passed by position if there are more positional arguments
+    max_args = sys.maxsize if position_num is None else position_num
+    Generator = np.random.Generator
+    # Positional arguments whose meaning does not change
+    ok_classes = (
+        Generator,
+        np.random.SeedSequence,
+        np.random.BitGenerator,
     )
 
+    def global_seed_set():
+        # Check whether global random state has been set
+        return np.random.mtrand._rand._bit_generator._seed_seq is None
+
     def decorator(fun):
         @functools.wraps(fun)
         def wrapper(*args, **kwargs):
+            # Fast path for the preferred use, `rng=<Generator>`, which needs no
+            # warning and which `np.random.default_rng` would return unchanged
+            if (
+                isinstance(kwargs.get(NEW_NAME), Generator)
+                and len(args) <= max_args
+                and old_name not in kwargs
+            ):
+                return fun(*args, **kwargs)
+
             # Determine how PRNG was passed
             as_old_kwarg = old_name in kwargs
             as_new_kwarg = NEW_NAME in kwargs
-            as_pos_arg = position_num is not None and len(args) >= position_num + 1
-            emit_warning = end_version is not None
+            as_pos_arg = len(args) > max_args
 
             # Can only specify PRNG one of the three ways
             if int(as_old_kwarg) + int(as_new_kwarg) + int(as_pos_arg) > 1:
@@ -102,19 +195,10 @@ def _transition_to_rng(old_name, *, position_num=None, end_version=None):
                 )
                 raise TypeError(message)
 
-            # Check whether global random state has been set
-            global_seed_set = np.random.mtrand._rand._bit_generator._seed_seq is None
-
             if as_old_kwarg:  # warn about deprecated use of old kwarg
                 kwargs[NEW_NAME] = kwargs.pop(old_name)
                 if emit_warning:
-                    message = (
-                        f"Use of keyword argument `{old_name}` is "
-                        f"deprecated and replaced by `{NEW_NAME}`.  "
-                        f"Support for `{old_name}` will be removed "
-                        f"in SciPy {end_version}."
-                    ) + cmn_msg
-                    warnings.warn(message, DeprecationWarning, stacklevel=2)
+                    warnings.warn(old_kwarg_message, DeprecationWarning, stacklevel=2)
 
             elif as_pos_arg:
                 # Warn about changing meaning of positional arg
@@ -127,50 +211,27 @@ def _transition_to_rng(old_name, *, position_num=None, end_version=None):
                 # If the argument is None and the global seed wasn't set, or if the
                 # argument is one of a few new classes, the user will not notice change
                 # in behavior.
-                ok_classes = (
-                    np.random.Generator,
-                    np.random.SeedSequence,
-                    np.random.BitGenerator,
-                )
-                if (arg is None and not global_seed_set) or isinstance(arg, ok_classes):
+                if (arg is None and not global_seed_set()) or isinstance(
+                    arg, ok_classes
+                ):
                     pass
                 elif emit_warning:
-                    message = (
-                        f"Positional use of `{NEW_NAME}` (formerly known as "
-                        f"`{old_name}`) is still allowed, but the behavior is "
-                        "changing: the argument will be normalized using "
-                        f"`np.random.default_rng` beginning in SciPy {end_version}, "
-                        "and the resulting `Generator` will be used to generate "
-                        "random numbers."
-                    ) + cmn_msg
-                    warnings.warn(message, FutureWarning, stacklevel=2)
+                    warnings.warn(pos_arg_message, FutureWarning, stacklevel=2)
 
             elif as_new_kwarg:  # no warnings; this is the preferred use
                 # After the removal of the decorator, normalization with
                 # np.random.default_rng will be done inside the decorated function
                 kwargs[NEW_NAME] = np.random.default_rng(kwargs[NEW_NAME])
 
-            elif global_seed_set and emit_warning:
+            elif emit_warning and global_seed_set():
                 # Emit FutureWarning if `np.random.seed` was used and no PRNG was passed
-                message = (
-                    "The NumPy global RNG was seeded by calling "
-                    f"`np.random.seed`. Beginning in {end_version}, this "
-                    "function will no longer use the global RNG."
-                ) + cmn_msg
-                warnings.warn(message, FutureWarning, stacklevel=2)
+                warnings.warn(global_seed_message, FutureWarning, stacklevel=2)
 
             return fun(*args, **kwargs)
 
-        # Add the old parameter name to the function signature
-        wrapped_signature = inspect.signature(fun)
-        wrapper.__signature__ = wrapped_signature.replace(
-            parameters=[
-                *wrapped_signature.parameters.values(),
-                inspect.Parameter(
-                    old_name, inspect.Parameter.KEYWORD_ONLY, default=None
-                ),
-            ]
-        )
+        # Add the old parameter name to the function signature, when it is first
+        # needed, e.g. by documentation tools, rather than on import
+        wrapper.__signature__ = _LazySignature(fun, old_name)
 
         return wrapper
 